@@ -1,42 +1,95 @@
-import os
 import time
+_IMPORT_STARTED = time.perf_counter()
+
+import os
 import atexit
-from flask import Flask, jsonify
+import threading
+from contextlib import contextmanager
+from flask import jsonify
 from dotenv import load_dotenv
+from config import STARTUP_BUDGET_SECONDS
 from database import init_db
-from scheduler import scheduler
-from new_ticket import new_ticket_bp  # Import the new_ticket Blueprint
+from scheduler import get_scheduler
+from new_ticket_templates import app as slack_app  # Slack routes, bulk API and profiling admin
+from health import health_bp
 
-load_dotenv()
-app = Flask(__name__)
-app.start_time = time.time()
+IMPORTS_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 2)
 
 # Configure upload folder
 UPLOAD_FOLDER = 'uploads'
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-# Initialize database
-init_db()
-
-# Register Blueprints
-app.register_blueprint(new_ticket_bp)  # Register the new_ticket Blueprint
-
-# Routes
-@app.route('/', methods=['GET'])
-def index():
-    return jsonify({
-        "status": "ok",
-        "message": "Ticket Bot is running",
-        "endpoints": [
-            "/api/tickets/slack/interactivity",
-            "/api/tickets/system-tickets",
-            "/api/tickets/ticket-summary",
-            "/api/tickets/new-ticket"
-        ]
-    })
+
+def _init_db_in_background(app, retry_seconds=5, max_retry_seconds=300):
+    """Create the schema off the startup path, retrying with backoff until the database is reachable."""
+    def run():
+        delay = retry_seconds
+        attempt = 1
+        while True:
+            try:
+                init_db()
+                app.config['DB_INITIALIZED'] = True
+                return
+            except Exception as e:
+                print(f"Database initialization failed (attempt {attempt}), retrying in {delay}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, max_retry_seconds)
+                attempt += 1
+    threading.Thread(target=run, name="init-db", daemon=True).start()
+
+def create_app():
+    """Application factory. Does no network I/O; the database is initialized in the background.
+
+    Builds on the Flask app in new_ticket_templates, which owns the Slack routes,
+    so the probes are served by the same process that handles Slack traffic.
+    """
+    load_dotenv()
+    app = slack_app
+    if 'STARTUP_REPORT' in app.config:
+        return app
+    app.start_time = time.time()
+    timings = {"imports_ms": IMPORTS_MS}
+
+    @contextmanager
+    def timed(phase):
+        started = time.perf_counter()
+        yield
+        timings[phase] = round((time.perf_counter() - started) * 1000, 2)
+
+    with timed("uploads_ms"):
+        app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+    # Register Blueprints
+    with timed("blueprints_ms"):
+        app.register_blueprint(health_bp)
+
+    app.config['DB_INITIALIZED'] = False
+    _init_db_in_background(app)
+
+    # Routes
+    @app.route('/', methods=['GET'])
+    def index():
+        return jsonify({
+            "status": "ok",
+            "message": "Ticket Bot is running",
+            "endpoints": [
+                "/slack/interactivity",
+                "/new-ticket",
+                "/api/tickets/bulk",
+                "/api/tickets/bulk-actions",
+                "/health",
+                "/ready"
+            ]
+        })
+
+    total = round((time.time() - app.start_time) * 1000 + IMPORTS_MS, 2)
+    app.config['STARTUP_REPORT'] = dict(timings, total_ms=total, budget_ms=STARTUP_BUDGET_SECONDS * 1000)
+    status = "within" if total <= STARTUP_BUDGET_SECONDS * 1000 else "OVER"
+    print(f"Startup took {total}ms ({status} budget of {STARTUP_BUDGET_SECONDS * 1000}ms): {timings}")
+    return app
 
 if __name__ == "__main__":
+    app = create_app()
+    scheduler = get_scheduler()
     scheduler.start()
     atexit.register(lambda: scheduler.shutdown())
-    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 8080)))
\ No newline at end of file
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 8080)))
@@ -0,0 +1,136 @@
+import heapq
+import itertools
+import threading
+from config import AUTO_ASSIGN_ENABLED, AUTO_ASSIGN_AGENTS
+from database import db_pool
+
+ACTIVE_STATUSES = ("Open", "In Progress")
+
+class LeastLoadedAssigner:
+    """Picks the agent with the fewest active tickets among those skilled for a (campaign, issue_type).
+
+    Keeps one lazy-deletion min-heap per skill key: a load change pushes a fresh
+    (count, seq, agent) entry and stale entries are discarded when they reach the top,
+    so picks and updates are O(log n) amortized. A heap is rebuilt from current loads
+    once it holds more than twice as many entries as it has eligible agents, which
+    keeps memory bounded for long-running processes.
+    """
+
+    def __init__(self, agents):
+        # agents: {user_id: {"campaigns": [...], "issue_types": [...]}}, empty lists mean "any"
+        self.agents = {agent: {"campaigns": set(skills.get("campaigns") or []),
+                               "issue_types": set(skills.get("issue_types") or [])}
+                       for agent, skills in agents.items()}
+        self.load = {agent: 0 for agent in self.agents}
+        self._heaps = {}
+        self._eligible = {}
+        self._keys_by_agent = {agent: set() for agent in self.agents}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._seeded = False
+
+    def _is_skilled(self, agent, campaign, issue_type):
+        skills = self.agents[agent]
+        return ((not skills["campaigns"] or campaign in skills["campaigns"]) and
+                (not skills["issue_types"] or issue_type in skills["issue_types"]))
+
+    def _build_heap(self, key):
+        heap = [(self.load[agent], next(self._seq), agent) for agent in self._eligible[key]]
+        heapq.heapify(heap)
+        self._heaps[key] = heap
+        return heap
+
+    def _heap_for(self, key):
+        heap = self._heaps.get(key)
+        if heap is None:
+            self._eligible[key] = [agent for agent in self.agents if self._is_skilled(agent, *key)]
+            for agent in self._eligible[key]:
+                self._keys_by_agent[agent].add(key)
+            heap = self._build_heap(key)
+        return heap
+
+    def _set_load(self, agent, count):
+        self.load[agent] = max(count, 0)
+        for key in self._keys_by_agent[agent]:
+            heap = self._heaps[key]
+            heapq.heappush(heap, (self.load[agent], next(self._seq), agent))
+            if len(heap) > 2 * len(self._eligible[key]):
+                self._build_heap(key)
+
+    def seed(self, counts):
+        """Replace all loads with {agent: active_ticket_count} and rebuild the heaps."""
+        with self._lock:
+            self.load = {agent: counts.get(agent, 0) for agent in self.agents}
+            self._heaps = {}
+            self._eligible = {}
+            self._keys_by_agent = {agent: set() for agent in self.agents}
+            self._seeded = True
+
+    def is_seeded(self):
+        """Whether seed() has run since this assigner was created."""
+        return self._seeded
+
+    def pick(self, campaign, issue_type):
+        """Reserve and return the least-loaded skilled agent, or None if nobody is eligible."""
+        with self._lock:
+            heap = self._heap_for((campaign, issue_type))
+            while heap:
+                count, _, agent = heap[0]
+                if count != self.load[agent]:
+                    heapq.heappop(heap)
+                    continue
+                self._set_load(agent, count + 1)
+                return agent
+            return None
+
+    def adjust(self, agent, delta):
+        """Change an agent's active ticket count; unknown agents are ignored."""
+        with self._lock:
+            if agent in self.load:
+                self._set_load(agent, self.load[agent] + delta)
+
+    def track_transition(self, old_assignee, old_status, new_assignee, new_status):
+        """Update loads for a ticket moving from (old_assignee, old_status) to (new_assignee, new_status)."""
+        was_active = old_status in ACTIVE_STATUSES
+        is_active = new_status in ACTIVE_STATUSES
+        if old_assignee == new_assignee and was_active == is_active:
+            return
+        if was_active:
+            self.adjust(old_assignee, -1)
+        if is_active:
+            self.adjust(new_assignee, 1)
+
+def load_active_counts():
+    """Return {assigned_to: count} of Open/In Progress tickets."""
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT assigned_to, count(*) FROM tickets "
+            "WHERE status IN ('Open', 'In Progress') AND assigned_to <> 'Unassigned' GROUP BY assigned_to"
+        )
+        return dict(cur.fetchall())
+    finally:
+        db_pool.putconn(conn)
+
+assigner = LeastLoadedAssigner(AUTO_ASSIGN_AGENTS)
+
+def reseed_assigner():
+    """Reload agent loads from the database so per-process counts don't drift."""
+    try:
+        assigner.seed(load_active_counts())
+    except Exception as e:
+        print(f"Error seeding auto-assignment loads, starting from zero: {e}")
+        assigner.seed({})
+
+def auto_assign(campaign, issue_type):
+    """Return the agent a new ticket should be assigned to, or None when auto-assignment is off."""
+    if not AUTO_ASSIGN_ENABLED or not assigner.agents:
+        return None
+    if not assigner.is_seeded():
+        reseed_assigner()
+    return assigner.pick(campaign, issue_type)
+
+def track_transition(old_assignee, old_status, new_assignee, new_status):
+    if AUTO_ASSIGN_ENABLED:
+        assigner.track_transition(old_assignee, old_status, new_assignee, new_status)
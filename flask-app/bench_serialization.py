@@ -0,0 +1,52 @@
+"""Benchmark the Slack payload serializer against stdlib json.
+
+Usage: python bench_serialization.py [iterations]
+"""
+import json
+import sys
+import time
+from serialization import BACKEND, dumps, loads, cached_fragment
+from new_ticket_templates import build_new_ticket_modal, get_system_ticket_blocks
+
+def sample_interactivity_payload():
+    """A view_submission payload shaped like the one Slack sends for the new ticket modal."""
+    modal = build_new_ticket_modal()
+    return json.dumps({
+        "type": "view_submission",
+        "user": {"id": "U0123456789", "username": "agent", "team_id": "T0123456789"},
+        "view": dict(modal, id="V0123456789", state={"values": {
+            "campaign_block": {"campaign_select": {"type": "static_select", "selected_option": modal["blocks"][2]["element"]["options"][0]}},
+            "issue_type_block": {"issue_type_select": {"type": "static_select", "selected_option": modal["blocks"][3]["element"]["options"][0]}},
+            "priority_block": {"priority_select": {"type": "static_select", "selected_option": modal["blocks"][4]["element"]["options"][2]}},
+            "details_block": {"details_input": {"type": "plain_text_input", "value": "Salesforce freezes when opening a claim. " * 10}}
+        }})
+    })
+
+def timeit(fn, iterations):
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1e6
+
+def main(iterations=2000):
+    raw = sample_interactivity_payload()
+    modal = build_new_ticket_modal()
+    blocks = get_system_ticket_blocks(42, "Camp Lejeune", "Vonage Dialer Functionality Issues", "High", "U0123456789",
+                                      "Dialer drops calls after 10 seconds", "https://example.my.salesforce.com/x", "No file uploaded")
+    body = {"channel": "C0123456789", "blocks": blocks, "text": "New Ticket T042"}
+    cases = [
+        ("decode interactivity payload", lambda: json.loads(raw), lambda: loads(raw)),
+        ("encode new ticket modal", lambda: json.dumps({"trigger_id": "x", "view": build_new_ticket_modal()}),
+         lambda: dumps({"trigger_id": "x", "view": cached_fragment("new_ticket_modal", build_new_ticket_modal)})),
+        ("encode ticket message", lambda: json.dumps(body), lambda: dumps(body)),
+    ]
+    print(f"backend: {BACKEND}, payload {len(raw)} bytes, modal {len(json.dumps(modal))} bytes, {iterations} iterations")
+    total_saved = 0.0
+    for name, baseline, fast in cases:
+        before, after = timeit(baseline, iterations), timeit(fast, iterations)
+        total_saved += before - after
+        print(f"{name:32s} stdlib {before:8.1f}us  {BACKEND} {after:8.1f}us  saved {before - after:8.1f}us")
+    print(f"CPU saved per request (sum of the above): {total_saved:.1f}us")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,129 @@
+import hmac
+from flask import Blueprint, request, jsonify
+from slack_sdk.errors import SlackApiError
+from config import BULK_API_TOKEN
+from slack_client import client
+from request_verification import verify_slack_signature
+from utils import bulk_update_tickets, list_active_tickets, is_authorized_user
+
+bulk_actions_bp = Blueprint("bulk_actions", __name__, url_prefix="/api/tickets")
+
+# Target status and allowed source statuses for each bulk action
+BULK_ACTIONS = {
+    "assign": ("In Progress", ("Open", "In Progress")),
+    "resolve": ("Resolved", ("Open", "In Progress")),
+    "close": ("Closed", ("Open", "In Progress", "Resolved")),
+}
+
+def run_bulk_action(action, ticket_ids, user_id, assigned_to=None, comment=None):
+    """Apply a bulk action and return the IDs of the tickets that were updated."""
+    if action not in BULK_ACTIONS:
+        raise ValueError(f"Unknown bulk action: {action}")
+    if action == "assign" and not assigned_to:
+        assigned_to = user_id
+    status, from_statuses = BULK_ACTIONS[action]
+    return bulk_update_tickets(
+        ticket_ids,
+        status,
+        from_statuses,
+        assigned_to=assigned_to if action == "assign" else None,
+        comment=comment,
+        action_user_id=user_id
+    )
+
+def build_bulk_actions_modal(tickets):
+    """Construct the modal for acting on several tickets at once."""
+    ticket_options = [
+        {"text": {"type": "plain_text", "text": f"T{tid:03d} | {priority} | {status} | {issue_type}"[:75]}, "value": str(tid)}
+        for tid, issue_type, priority, status in tickets
+    ]
+    return {
+        "type": "modal",
+        "callback_id": "bulk_ticket_actions",
+        "title": {"type": "plain_text", "text": "Bulk Ticket Actions"},
+        "submit": {"type": "plain_text", "text": "Apply ✅"},
+        "close": {"type": "plain_text", "text": "Cancel"},
+        "blocks": [
+            {"type": "input", "block_id": "bulk_tickets_block", "label": {"type": "plain_text", "text": "🎟️ Tickets"}, "element": {
+                "type": "multi_static_select", "action_id": "bulk_tickets_select", "placeholder": {"type": "plain_text", "text": "Select tickets"},
+                "options": ticket_options
+            }},
+            {"type": "input", "block_id": "bulk_action_block", "label": {"type": "plain_text", "text": "⚙️ Action"}, "element": {
+                "type": "static_select", "action_id": "bulk_action_select", "placeholder": {"type": "plain_text", "text": "Select an action"},
+                "options": [
+                    {"text": {"type": "plain_text", "text": "🖐 Assign"}, "value": "assign"},
+                    {"text": {"type": "plain_text", "text": "🟢 Resolve"}, "value": "resolve"},
+                    {"text": {"type": "plain_text", "text": "❌ Close"}, "value": "close"}
+                ]
+            }},
+            {"type": "input", "block_id": "bulk_assignee_block", "label": {"type": "plain_text", "text": "👤 Assign To"}, "element": {
+                "type": "users_select", "action_id": "bulk_assignee_select", "placeholder": {"type": "plain_text", "text": "Defaults to you"}
+            }, "optional": True},
+            {"type": "input", "block_id": "bulk_comment_block", "label": {"type": "plain_text", "text": "💬 Comment"}, "element": {
+                "type": "plain_text_input", "action_id": "bulk_comment_input", "multiline": True
+            }, "optional": True}
+        ]
+    }
+
+def handle_bulk_submission(payload):
+    """Process a bulk actions modal submission."""
+    state = payload["view"]["state"]["values"]
+    user_id = payload["user"]["id"]
+    selected = state["bulk_tickets_block"]["bulk_tickets_select"].get("selected_options") or []
+    action = state["bulk_action_block"]["bulk_action_select"]["selected_option"]["value"]
+    assigned_to = state.get("bulk_assignee_block", {}).get("bulk_assignee_select", {}).get("selected_user")
+    comment = state.get("bulk_comment_block", {}).get("bulk_comment_input", {}).get("value")
+    updated = run_bulk_action(action, [o["value"] for o in selected], user_id, assigned_to, comment)
+    try:
+        client.chat_postMessage(channel=user_id, text=f"✅ Bulk {action} applied to {len(updated)} ticket(s).")
+    except SlackApiError as e:
+        print(f"Error sending bulk action confirmation: {e}")
+    return updated
+
+def open_bulk_actions_modal(trigger_id, user_id):
+    """Open the bulk actions modal. Returns an error message, or None on success."""
+    if not trigger_id:
+        return "Error: No trigger_id"
+    if not is_authorized_user(user_id):
+        return "❌ You are not authorized to run bulk actions."
+    try:
+        client.views_open(trigger_id=trigger_id, view=build_bulk_actions_modal(list_active_tickets()))
+        return None
+    except SlackApiError as e:
+        print(f"Error opening bulk actions modal: {e}")
+        return "Error opening modal"
+
+@bulk_actions_bp.route('/bulk-actions', methods=['POST'])
+@verify_slack_signature
+def bulk_actions_command():
+    """Handle the /bulk-tickets command to open the bulk actions modal."""
+    error = open_bulk_actions_modal(request.form.get('trigger_id'), request.form.get('user_id'))
+    if error:
+        return jsonify({"text": error}), 200
+    return "", 200
+
+@bulk_actions_bp.route('/bulk', methods=['POST'])
+def bulk_actions_api():
+    """Apply assign/resolve/close to a list of tickets.
+
+    Requires "Authorization: Bearer <BULK_API_TOKEN>" and a user_id that is a member
+    of the systems channel. Expects JSON: {"action", "ticket_ids", "user_id",
+    optional "assigned_to" and "comment"}.
+    """
+    auth = request.headers.get("Authorization", "")
+    supplied = auth[len("Bearer "):].strip() if auth.startswith("Bearer ") else ""
+    if not BULK_API_TOKEN or not hmac.compare_digest(supplied, BULK_API_TOKEN):
+        return jsonify({"error": "forbidden"}), 403
+    data = request.get_json(silent=True) or {}
+    action = data.get("action")
+    ticket_ids = data.get("ticket_ids") or []
+    user_id = data.get("user_id")
+    if action not in BULK_ACTIONS or not isinstance(ticket_ids, list) or not user_id:
+        return jsonify({"error": "action, ticket_ids and user_id are required"}), 400
+    if not is_authorized_user(user_id):
+        return jsonify({"error": "user is not authorized to run bulk actions"}), 403
+    try:
+        updated = run_bulk_action(action, ticket_ids, user_id, data.get("assigned_to"), data.get("comment"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"status": "ok", "action": action, "updated": updated})
@@ -0,0 +1,72 @@
+from config import COMMENTS_PAGE_SIZE
+from utils import format_comment, get_comments_page, find_ticket_by_id, add_ticket_comment
+
+def build_comments_modal(ticket_id, comments, total, page=0, per_page=COMMENTS_PAGE_SIZE):
+    """Construct a modal showing one page of a ticket's comment history."""
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": f"*Comments for T{ticket_id:03d}* ({total} total)"}}, {"type": "divider"}]
+    if not comments:
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "No comments yet."}})
+    for comment in comments:
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": format_comment(comment)}})
+    # Pagination buttons
+    total_pages = (total + per_page - 1) // per_page
+    if total_pages > 1:
+        buttons = []
+        if page > 0:
+            buttons.append({"type": "button", "text": {"type": "plain_text", "text": "Previous"},
+                            "action_id": "comments_prev_page", "value": f"{ticket_id}:{page - 1}"})
+        if page < total_pages - 1:
+            buttons.append({"type": "button", "text": {"type": "plain_text", "text": "Next"},
+                            "action_id": "comments_next_page", "value": f"{ticket_id}:{page + 1}"})
+        blocks.append({"type": "context", "elements": [{"type": "mrkdwn", "text": f"Page {page + 1} of {total_pages}"}]})
+        blocks.append({"type": "actions", "elements": buttons})
+    return {
+        "type": "modal",
+        "callback_id": "comment_history_view",
+        "title": {"type": "plain_text", "text": "Comment History"},
+        "blocks": blocks
+    }
+
+def build_add_comment_modal(ticket_id):
+    """Construct the modal for adding a comment to a ticket."""
+    return {
+        "type": "modal",
+        "callback_id": "add_ticket_comment",
+        "private_metadata": str(ticket_id),
+        "title": {"type": "plain_text", "text": "Add Comment"},
+        "submit": {"type": "plain_text", "text": "Post 💬"},
+        "close": {"type": "plain_text", "text": "Cancel"},
+        "blocks": [
+            {"type": "input", "block_id": "comment_block", "label": {"type": "plain_text", "text": f"💬 Comment on T{ticket_id:03d}"}, "element": {
+                "type": "plain_text_input", "action_id": "comment_input", "multiline": True
+            }}
+        ]
+    }
+
+def handle_add_comment_submission(payload):
+    """Store a submitted comment and append it to the ticket thread without rewriting the parent message."""
+    ticket_id = int(payload["view"]["private_metadata"])
+    comment = payload["view"]["state"]["values"]["comment_block"]["comment_input"]["value"]
+    ticket = find_ticket_by_id(ticket_id)
+    if not ticket:
+        return False
+    return add_ticket_comment(ticket_id, payload["user"]["id"], comment, ticket[12])
+
+def handle_comment_history_action(payload, client):
+    """Open the add-comment modal or open/page the history modal. Returns False for any other action."""
+    action = payload["actions"][0]
+    action_id = action["action_id"]
+    if action_id.startswith("add_comment_"):
+        client.views_open(trigger_id=payload["trigger_id"], view=build_add_comment_modal(int(action["value"])))
+        return True
+    if action_id.startswith("view_comments_"):
+        ticket_id = int(action["value"])
+        total, comments = get_comments_page(ticket_id, 0)
+        client.views_open(trigger_id=payload["trigger_id"], view=build_comments_modal(ticket_id, comments, total, 0))
+        return True
+    if action_id in ["comments_next_page", "comments_prev_page"]:
+        ticket_id, page = (int(v) for v in action["value"].split(":"))
+        total, comments = get_comments_page(ticket_id, page)
+        client.views_update(view_id=payload["view"]["id"], view=build_comments_modal(ticket_id, comments, total, page))
+        return True
+    return False
@@ -1,8 +1,51 @@
 import os
+import json
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica for exports, reports and scheduler scans
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_CONNECT_TIMEOUT_SECONDS = int(os.getenv("REPLICA_CONNECT_TIMEOUT_SECONDS", "3"))
 TIMEZONE = os.getenv("TIMEZONE", "America/New_York")
 SYSTEM_ISSUES_CHANNEL = "C08JTKR1RPT"
-SLACK_CHANNEL_ID = SYSTEM_ISSUES_CHANNEL
\ No newline at end of file
+SLACK_CHANNEL_ID = SYSTEM_ISSUES_CHANNEL
+SLACK_UPDATE_CONCURRENCY = int(os.getenv("SLACK_UPDATE_CONCURRENCY", "4"))
+# Bearer token for /api/tickets/bulk (the route refuses all calls when unset)
+BULK_API_TOKEN = os.getenv("BULK_API_TOKEN")
+INCIDENT_WINDOW_MINUTES = int(os.getenv("INCIDENT_WINDOW_MINUTES", "15"))
+INCIDENT_SIMILARITY_THRESHOLD = float(os.getenv("INCIDENT_SIMILARITY_THRESHOLD", "0.3"))
+INCIDENT_COUNTER_INTERVAL_SECONDS = float(os.getenv("INCIDENT_COUNTER_INTERVAL_SECONDS", "30"))
+# Comment history rendering (a Slack section holds at most 3000 characters)
+COMMENT_PREVIEW_COUNT = int(os.getenv("COMMENT_PREVIEW_COUNT", "3"))
+COMMENTS_PAGE_SIZE = int(os.getenv("COMMENTS_PAGE_SIZE", "10"))
+COMMENT_MAX_CHARS = 500
+COMMENTS_SECTION_MAX_CHARS = 3000
+# Startup and readiness
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))
+READY_CACHE_SECONDS = float(os.getenv("READY_CACHE_SECONDS", "10"))
+# Ticket event log write-behind
+EVENT_FLUSH_BATCH_SIZE = int(os.getenv("EVENT_FLUSH_BATCH_SIZE", "500"))
+EVENT_FLUSH_INTERVAL_SECONDS = float(os.getenv("EVENT_FLUSH_INTERVAL_SECONDS", "5"))
+EVENT_BUFFER_MAX = int(os.getenv("EVENT_BUFFER_MAX", "50000"))
+# Ticket partitioning and archival
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+# Auto-assignment: AUTO_ASSIGN_AGENTS is JSON {"<user_id>": {"campaigns": [...], "issue_types": [...]}}
+AUTO_ASSIGN_ENABLED = os.getenv("AUTO_ASSIGN_ENABLED", "false").lower() == "true"
+AUTO_ASSIGN_AGENTS = json.loads(os.getenv("AUTO_ASSIGN_AGENTS", "{}"))
+# Socket Mode transport (PROCESS_TYPE=socket); SOCKET_MODE_URL points at a local websocket stand-in for testing
+SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
+SOCKET_MODE_URL = os.getenv("SOCKET_MODE_URL")
+SOCKET_MODE_WORKERS = int(os.getenv("SOCKET_MODE_WORKERS", "8"))
+# Slack request verification
+SLACK_MAX_BODY_BYTES = int(os.getenv("SLACK_MAX_BODY_BYTES", str(256 * 1024)))
+SLACK_TIMESTAMP_TOLERANCE_SECONDS = int(os.getenv("SLACK_TIMESTAMP_TOLERANCE_SECONDS", "300"))
+# Slack user directory cache
+USER_DIRECTORY_TTL_SECONDS = int(os.getenv("USER_DIRECTORY_TTL_SECONDS", str(6 * 3600)))
+# Admin-only profiling endpoints (disabled unless ADMIN_TOKEN is set)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.1"))
+PROFILING_SLOW_TRACES = int(os.getenv("PROFILING_SLOW_TRACES", "20"))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
@@ -1,31 +1,360 @@
 import os
+import threading
+import time
+from datetime import date
 import psycopg2
 from psycopg2 import pool
+from profiling import TimedCursor
+from config import (DATABASE_URL, DATABASE_READ_URL, REPLICA_MAX_LAG_SECONDS, REPLICA_CONNECT_TIMEOUT_SECONDS,
+                    PARTITION_MONTHS_AHEAD, ARCHIVE_AFTER_DAYS)
 
-# Initialize a connection pool
-db_pool = pool.SimpleConnectionPool(
-    minconn=1,
-    maxconn=10,
-    dsn=os.getenv("DATABASE_URL")
+class LazyConnectionPool:
+    """Connection pool that connects on first use and rebuilds itself after a fork.
+
+    Importing this module never touches the network, so gunicorn workers each
+    open their own connections after forking.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, **connect_kwargs):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.connect_kwargs = connect_kwargs
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    self._pool = pool.ThreadedConnectionPool(
+                        minconn=self.minconn, maxconn=self.maxconn, dsn=self.dsn, cursor_factory=TimedCursor,
+                        **self.connect_kwargs
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    def getconn(self):
+        return self._get_pool().getconn()
+
+    def putconn(self, conn, close=False):
+        self._get_pool().putconn(conn, close=close)
+
+    def closeall(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.closeall()
+        self._pool = None
+
+class ReadRoutingPool:
+    """getconn/putconn for read-only call sites: uses the replica when it is configured,
+    reachable and within max_lag_seconds of the primary, otherwise falls back to the primary.
+
+    A replica that is lagging, not streaming, or unreachable is skipped for
+    lag_check_interval seconds before it is tried again.
+    """
+
+    def __init__(self, primary, replica=None, max_lag_seconds=30, lag_check_interval=10):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self._owners = {}
+        self._replica_ok = True
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _replica_lag(self, conn):
+        """Seconds the replica is behind, or None if it is not streaming from the primary.
+
+        Receive and replay positions being equal only means the replica has applied
+        everything it received, so the WAL receiver must also be streaming.
+        """
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT pg_is_in_recovery(),
+                       (SELECT status FROM pg_stat_wal_receiver),
+                       CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                       END
+            """)
+            in_recovery, receiver_status, lag = cur.fetchone()
+        conn.rollback()
+        if not in_recovery:
+            return 0.0
+        if receiver_status != "streaming":
+            return None
+        return float(lag)
+
+    def _mark_replica(self, ok):
+        self._replica_ok = ok
+        self._checked_at = time.time()
+
+    def getconn(self):
+        due = time.time() - self._checked_at >= self.lag_check_interval
+        if self.replica is not None and (self._replica_ok or due):
+            conn = None
+            try:
+                conn = self.replica.getconn()
+                if due:
+                    lag = self._replica_lag(conn)
+                    self._mark_replica(lag is not None and lag <= self.max_lag_seconds)
+                    if lag is None:
+                        print("Read replica is not streaming from the primary; routing reads to primary")
+                    elif not self._replica_ok:
+                        print(f"Read replica is {lag:.1f}s behind; routing reads to primary")
+                if self._replica_ok:
+                    with self._lock:
+                        self._owners[id(conn)] = self.replica
+                    return conn
+                self.replica.putconn(conn)
+            except Exception as e:
+                self._mark_replica(False)
+                print(f"Read replica unavailable, using primary for {self.lag_check_interval}s: {e}")
+                if conn is not None:
+                    self.replica.putconn(conn, close=True)
+        conn = self.primary.getconn()
+        with self._lock:
+            self._owners[id(conn)] = self.primary
+        return conn
+
+    def putconn(self, conn):
+        with self._lock:
+            owner = self._owners.pop(id(conn), self.primary)
+        owner.putconn(conn)
+
+# Connection pools, created lazily on first getconn()
+db_pool = LazyConnectionPool(dsn=DATABASE_URL)
+# Read-only call sites (exports, scheduler scans, reports) use db_read_pool
+db_read_pool = ReadRoutingPool(
+    db_pool,
+    LazyConnectionPool(dsn=DATABASE_READ_URL, connect_timeout=REPLICA_CONNECT_TIMEOUT_SECONDS) if DATABASE_READ_URL else None,
+    max_lag_seconds=REPLICA_MAX_LAG_SECONDS
 )
 
+def ping_db():
+    """Run a trivial query to check the database is reachable."""
+    conn = db_pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            cur.fetchone()
+        conn.rollback()
+        return True
+    finally:
+        db_pool.putconn(conn)
+
+TICKET_COLUMNS = ("ticket_id, created_by, campaign, issue_type, priority, status, assigned_to, details, "
+                  "salesforce_link, file_url, created_at, updated_at, message_ts")
+
+TICKETS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS tickets (
+        ticket_id SERIAL,
+        created_by TEXT NOT NULL,
+        campaign TEXT,
+        issue_type TEXT,
+        priority TEXT DEFAULT 'Low',
+        status TEXT DEFAULT 'Open',
+        assigned_to TEXT DEFAULT 'Unassigned',
+        details TEXT,
+        salesforce_link TEXT,
+        file_url TEXT DEFAULT 'No file uploaded',
+        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        message_ts TEXT,
+        PRIMARY KEY (ticket_id, created_at)
+    ) PARTITION BY RANGE (created_at)
+"""
+
+def _create_ticket_indexes(cur):
+    cur.execute("CREATE INDEX IF NOT EXISTS tickets_ticket_id_idx ON tickets (ticket_id)")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS tickets_active_idx ON tickets (status, updated_at)
+        WHERE status IN ('Open', 'In Progress')
+    """)
+
 def init_db():
     """Initialize the database schema if necessary."""
     conn = db_pool.getconn()
     try:
         with conn.cursor() as cur:
-            # Example schema creation
+            cur.execute(TICKETS_TABLE_SQL)
+            cur.execute("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS message_ts TEXT")
+            _create_ticket_indexes(cur)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS tickets_archive (
+                    LIKE tickets,
+                    archived_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (ticket_id)
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS tickets_archive_created_at_idx ON tickets_archive (created_at)")
             cur.execute("""
-                CREATE TABLE IF NOT EXISTS tickets (
+                CREATE TABLE IF NOT EXISTS comments (
                     id SERIAL PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    status TEXT DEFAULT 'Open',
-                    priority TEXT DEFAULT 'Normal',
-                    assigned_to TEXT DEFAULT 'Unassigned',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    ticket_id INTEGER NOT NULL,
+                    user_id TEXT,
+                    comment_text TEXT NOT NULL,
+                    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS comments_ticket_id_idx ON comments (ticket_id, created_at)")
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS ticket_events (
+                    id BIGSERIAL PRIMARY KEY,
+                    ticket_id INTEGER NOT NULL,
+                    event_type TEXT NOT NULL,
+                    from_status TEXT,
+                    to_status TEXT,
+                    actor TEXT,
+                    assigned_to TEXT,
+                    occurred_at TIMESTAMPTZ NOT NULL
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS ticket_events_ticket_id_idx ON ticket_events (ticket_id, occurred_at)")
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS slack_users (
+                    user_id TEXT PRIMARY KEY,
+                    display_name TEXT NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL
                 )
             """)
             conn.commit()
     finally:
         db_pool.putconn(conn)
+    ensure_ticket_partitions()
+
+def _month_start(year, month):
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return date(year, month, 1)
+
+def ensure_ticket_partitions(months_ahead=PARTITION_MONTHS_AHEAD):
+    """Create monthly partitions of tickets from the current month through months_ahead.
+
+    Does nothing if tickets is a plain (unpartitioned) table from an older deployment;
+    run migrate_partitions.py once to convert it.
+    """
+    today = date.today()
+    conn = db_pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('tickets')")
+            row = cur.fetchone()
+            if not row or row[0] != "p":
+                print("tickets is not a partitioned table; skipping partition maintenance "
+                      "(run migrate_partitions.py to convert it)")
+                return []
+            created = _create_month_partitions(cur, today, _month_start(today.year, today.month + months_ahead))
+            conn.commit()
+            return created
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        db_pool.putconn(conn)
+
+def _create_month_partitions(cur, first, last):
+    """Create the monthly partitions covering first..last (dates) plus the default partition."""
+    cur.execute("CREATE TABLE IF NOT EXISTS tickets_default PARTITION OF tickets DEFAULT")
+    created = []
+    start = _month_start(first.year, first.month)
+    while start <= last:
+        end = _month_start(start.year, start.month + 1)
+        name = f"tickets_y{start.year}m{start.month:02d}"
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF tickets "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        created.append(name)
+        start = end
+    return created
+
+def migrate_tickets_to_partitioned(months_ahead=PARTITION_MONTHS_AHEAD):
+    """One-time conversion of a plain tickets table into the partitioned layout.
+
+    Renames the old table (and its indexes) to tickets_unpartitioned, creates the
+    partitioned tickets table with one partition per month since the oldest ticket,
+    copies every row, and moves the ticket_id sequence past the highest copied id.
+    Runs in a single transaction holding an exclusive lock on tickets, so stop the
+    app first. Returns the number of rows copied, or None if there was nothing to do.
+    The old table is kept for inspection; drop it once the migration is verified.
+    """
+    conn = db_pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('tickets')")
+            row = cur.fetchone()
+            if not row or row[0] == "p":
+                conn.rollback()
+                return None
+            cur.execute("SELECT to_regclass('tickets_unpartitioned')")
+            if cur.fetchone()[0] is not None:
+                raise RuntimeError("tickets_unpartitioned already exists; drop it before migrating again")
+            cur.execute("LOCK TABLE tickets IN ACCESS EXCLUSIVE MODE")
+            cur.execute("ALTER TABLE tickets RENAME TO tickets_unpartitioned")
+            # Index and constraint names are schema-wide, so move the old ones out of the way
+            cur.execute("""
+                SELECT i.relname, c.conname
+                FROM pg_index x
+                JOIN pg_class i ON i.oid = x.indexrelid
+                LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid AND c.conrelid = x.indrelid
+                WHERE x.indrelid = 'tickets_unpartitioned'::regclass
+            """)
+            for index_name, constraint_name in cur.fetchall():
+                new_name = f"{index_name[:48]}_unpartitioned"
+                if constraint_name:
+                    cur.execute(f'ALTER TABLE tickets_unpartitioned RENAME CONSTRAINT "{constraint_name}" TO "{new_name}"')
+                else:
+                    cur.execute(f'ALTER INDEX "{index_name}" RENAME TO "{new_name}"')
+            # The old SERIAL sequence is still named tickets_ticket_id_seq and owned by the old table
+            cur.execute("SELECT pg_get_serial_sequence('tickets_unpartitioned', 'ticket_id')")
+            old_sequence = cur.fetchone()[0]
+            if old_sequence:
+                cur.execute(f"ALTER SEQUENCE {old_sequence} RENAME TO tickets_unpartitioned_ticket_id_seq")
+            cur.execute("ALTER TABLE tickets_unpartitioned ADD COLUMN IF NOT EXISTS message_ts TEXT")
+            cur.execute(TICKETS_TABLE_SQL)
+            cur.execute("SELECT min(COALESCE(created_at, updated_at, CURRENT_TIMESTAMP))::date FROM tickets_unpartitioned")
+            oldest = cur.fetchone()[0] or date.today()
+            today = date.today()
+            _create_month_partitions(cur, oldest, _month_start(today.year, today.month + months_ahead))
+            cur.execute(f"""
+                INSERT INTO tickets ({TICKET_COLUMNS})
+                SELECT {TICKET_COLUMNS.replace("created_at", "COALESCE(created_at, updated_at, CURRENT_TIMESTAMP)", 1)}
+                FROM tickets_unpartitioned
+            """)
+            copied = cur.rowcount
+            cur.execute("""
+                SELECT setval(pg_get_serial_sequence('tickets', 'ticket_id'),
+                              COALESCE((SELECT max(ticket_id) FROM tickets), 0) + 1, false)
+            """)
+            _create_ticket_indexes(cur)
+        conn.commit()
+        return copied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        db_pool.putconn(conn)
+
+def archive_closed_tickets(older_than_days=ARCHIVE_AFTER_DAYS):
+    """Move tickets closed or resolved more than older_than_days ago into tickets_archive."""
+    conn = db_pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                WITH moved AS (
+                    DELETE FROM tickets
+                    WHERE status IN ('Closed', 'Resolved')
+                      AND updated_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+                    RETURNING *
+                )
+                INSERT INTO tickets_archive SELECT *, CURRENT_TIMESTAMP FROM moved
+            """, (older_than_days,))
+            archived = cur.rowcount
+        conn.commit()
+        return archived
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        db_pool.putconn(conn)
@@ -0,0 +1,166 @@
+import atexit
+import csv
+import io
+import os
+import threading
+from datetime import datetime
+import pytz
+from config import TIMEZONE, EVENT_FLUSH_BATCH_SIZE, EVENT_FLUSH_INTERVAL_SECONDS, EVENT_BUFFER_MAX
+from database import db_pool, db_read_pool
+
+EVENT_COLUMNS = ("ticket_id", "event_type", "from_status", "to_status", "actor", "assigned_to", "occurred_at")
+
+class TicketEventLog:
+    """Append-only ticket event stream, buffered in memory and written with COPY in batches.
+
+    record() never touches the database; a background thread flushes when the
+    buffer reaches batch_size or every flush_interval seconds, and once more at exit.
+    Failed batches are re-queued; during a long outage only the newest max_buffer
+    events are kept.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=5.0, max_buffer=50000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._atexit_registered = False
+        self.dropped = 0
+
+    def record(self, ticket_id, event_type, to_status=None, from_status=None, actor=None, assigned_to=None, occurred_at=None):
+        """Queue one event for the next flush."""
+        occurred_at = occurred_at or datetime.now(pytz.timezone(TIMEZONE))
+        with self._lock:
+            self._buffer.append((ticket_id, event_type, from_status, to_status, actor, assigned_to, occurred_at))
+            self._trim()
+            pending = len(self._buffer)
+        self._ensure_started()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _trim(self):
+        """Drop the oldest events beyond max_buffer. Caller holds self._lock."""
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            print(f"Ticket event buffer full; dropped {overflow} oldest events ({self.dropped} total)")
+
+    def _needs_thread(self):
+        return not self._closed and (self._thread is None or not self._thread.is_alive() or self._pid != os.getpid())
+
+    def _ensure_started(self):
+        if self._needs_thread():
+            with self._lock:
+                if self._needs_thread():
+                    self._pid = os.getpid()
+                    self._stopped.clear()
+                    self._thread = threading.Thread(target=self._run, name="ticket-event-flusher", daemon=True)
+                    self._thread.start()
+                    if not self._atexit_registered:
+                        atexit.register(self.shutdown)
+                        self._atexit_registered = True
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Ticket event flusher error: {e}")
+
+    def flush(self):
+        """Write all buffered events with one COPY. Returns the number of events written."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        data = io.StringIO()
+        writer = csv.writer(data)
+        for row in batch:
+            writer.writerow(["" if v is None else v for v in row[:-1]] + [row[-1].isoformat()])
+        data.seek(0)
+        conn = None
+        try:
+            conn = db_pool.getconn()
+            with conn.cursor() as cur:
+                cur.copy_expert(
+                    f"COPY ticket_events ({', '.join(EVENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+                    data
+                )
+            conn.commit()
+            return len(batch)
+        except Exception as e:
+            print(f"Error flushing {len(batch)} ticket events: {e}")
+            with self._lock:
+                self._buffer = batch + self._buffer
+                self._trim()
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            return 0
+        finally:
+            if conn is not None:
+                db_pool.putconn(conn)
+
+    def shutdown(self):
+        """Stop the flusher and write whatever is still buffered."""
+        self._closed = True
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval)
+        self.flush()
+
+event_log = TicketEventLog(batch_size=EVENT_FLUSH_BATCH_SIZE, flush_interval=EVENT_FLUSH_INTERVAL_SECONDS,
+                           max_buffer=EVENT_BUFFER_MAX)
+
+def record_ticket_event(ticket_id, event_type, to_status=None, from_status=None, actor=None, assigned_to=None):
+    event_log.record(ticket_id, event_type, to_status, from_status, actor, assigned_to)
+
+def ticket_lifecycle_stats(start_date=None, end_date=None):
+    """Average time-to-assign and time-to-resolve, in hours, for tickets created in the date range.
+
+    Measured from tickets.created_at (live and archived rows) to the first matching event.
+    """
+    where_clauses = []
+    params = []
+    if start_date:
+        where_clauses.append("created_at >= %s")
+        params.append(start_date)
+    if end_date:
+        where_clauses.append("created_at < %s::date + 1")
+        params.append(end_date)
+    where = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    query = (
+        "SELECT count(*),"
+        "       avg(EXTRACT(EPOCH FROM a.first_at - c.created_at)) / 3600,"
+        "       avg(EXTRACT(EPOCH FROM r.first_at - c.created_at)) / 3600 "
+        f"FROM (SELECT ticket_id, created_at FROM tickets{where}"
+        f"      UNION ALL SELECT ticket_id, created_at FROM tickets_archive{where}) c "
+        "LEFT JOIN (SELECT ticket_id, min(occurred_at) AS first_at FROM ticket_events "
+        "           WHERE event_type = 'assigned' GROUP BY ticket_id) a ON a.ticket_id = c.ticket_id "
+        "LEFT JOIN (SELECT ticket_id, min(occurred_at) AS first_at FROM ticket_events "
+        "           WHERE to_status = 'Resolved' GROUP BY ticket_id) r ON r.ticket_id = c.ticket_id"
+    )
+    conn = db_read_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(query, params * 2)
+        total, hours_to_assign, hours_to_resolve = cur.fetchone()
+        return {
+            "tickets": total,
+            "avg_hours_to_assign": float(hours_to_assign) if hours_to_assign is not None else None,
+            "avg_hours_to_resolve": float(hours_to_resolve) if hours_to_resolve is not None else None
+        }
+    finally:
+        db_read_pool.putconn(conn)
@@ -0,0 +1,48 @@
+import threading
+import time
+from flask import Blueprint, current_app, jsonify
+from config import READY_CACHE_SECONDS
+from database import ping_db
+from slack_client import client
+
+health_bp = Blueprint("health", __name__)
+
+_ready_cache = {"checked_at": 0.0, "result": None}
+_ready_lock = threading.Lock()
+
+def check_readiness():
+    """Check that Postgres and Slack are reachable, caching the result for READY_CACHE_SECONDS."""
+    with _ready_lock:
+        if _ready_cache["result"] is not None and time.time() - _ready_cache["checked_at"] < READY_CACHE_SECONDS:
+            return _ready_cache["result"]
+        checks = {}
+        try:
+            checks["database"] = ping_db()
+        except Exception as e:
+            print(f"Readiness: database check failed: {e}")
+            checks["database"] = False
+        try:
+            checks["slack"] = bool(client.auth_test().get("ok"))
+        except Exception as e:
+            print(f"Readiness: Slack check failed: {e}")
+            checks["slack"] = False
+        _ready_cache["result"] = checks
+        _ready_cache["checked_at"] = time.time()
+        return checks
+
+@health_bp.route('/health', methods=['GET'])
+def health():
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({
+        "status": "ok",
+        "uptime_seconds": round(time.time() - current_app.start_time, 1),
+        "startup": current_app.config.get("STARTUP_REPORT", {})
+    })
+
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: the database schema is initialized and Postgres and Slack are reachable."""
+    checks = dict(check_readiness())
+    checks["schema"] = current_app.config.get("DB_INITIALIZED", False)
+    is_ready = all(checks.values())
+    return jsonify({"status": "ready" if is_ready else "not ready", "checks": checks}), 200 if is_ready else 503
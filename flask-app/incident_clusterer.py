@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from slack_sdk.errors import SlackApiError
+
+def trigrams(text):
+    """Return the set of character trigrams of the normalized text."""
+    normalized = " ".join((text or "").lower().split())
+    if len(normalized) < 3:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + 3] for i in range(len(normalized) - 2)}
+
+def similarity(a, b):
+    """Jaccard similarity of two trigram sets."""
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class Incident:
+    """A burst of similar tickets collapsed into one channel message and its thread."""
+
+    def __init__(self, key, root_ticket_id, signature, now, max_signatures):
+        self.key = key
+        self.root_ticket_id = root_ticket_id
+        self.root_ts = None
+        self.ticket_ids = [root_ticket_id]
+        self.signatures = deque([signature], maxlen=max_signatures)
+        self.last_seen = now
+        # Set once the root message is posted (or posting failed)
+        self.ready = threading.Event()
+        self.failed = False
+        # Counter reply in the thread, edited at most once per counter interval
+        self.counter_ts = None
+        self.counter_count = 0
+        self.counter_updated_at = 0.0
+        self.counter_timer = None
+        self.lock = threading.Lock()
+
+    def matches(self, signature, threshold):
+        return any(similarity(signature, s) >= threshold for s in self.signatures)
+
+class IncidentClusterer:
+    """Sliding-window clusterer keyed on (issue_type, campaign) with trigram similarity over details."""
+
+    def __init__(self, window_minutes=15, threshold=0.3, max_signatures=5, counter_interval=30):
+        self.window = timedelta(minutes=window_minutes)
+        self.threshold = threshold
+        self.max_signatures = max_signatures
+        self.counter_interval = counter_interval
+        self._incidents = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        for key in list(self._incidents):
+            active = [i for i in self._incidents[key] if now - i.last_seen <= self.window and not i.failed]
+            if active:
+                self._incidents[key] = active
+            else:
+                del self._incidents[key]
+
+    def find_or_open(self, issue_type, campaign, details, ticket_id, now):
+        """Attach the ticket to a matching incident, or open a new one rooted at it.
+
+        Returns (incident, is_new). Both happen under one lock, so simultaneous
+        similar tickets cannot each open their own incident. For a new incident
+        the caller must post the root message and call root_posted().
+        """
+        signature = trigrams(details)
+        key = (issue_type, campaign)
+        with self._lock:
+            self._expire(now)
+            for incident in self._incidents.get(key, []):
+                if incident.matches(signature, self.threshold):
+                    incident.ticket_ids.append(ticket_id)
+                    incident.signatures.append(signature)
+                    incident.last_seen = now
+                    return incident, False
+            incident = Incident(key, ticket_id, signature, now, self.max_signatures)
+            self._incidents.setdefault(key, []).append(incident)
+            return incident, True
+
+    def root_posted(self, incident, message_ts):
+        """Record the root message ts (None if posting failed) and release waiting tickets."""
+        incident.root_ts = message_ts
+        incident.failed = message_ts is None
+        incident.ready.set()
+
+def _counter_text(incident):
+    issue_type, campaign = incident.key
+    return f"🚨 *Possible outage:* {len(incident.ticket_ids)} similar tickets for _{issue_type}_ ({campaign}) in this thread"
+
+def _update_counter(client, channel, incident):
+    """Post the counter reply, or edit it in place, with the current ticket count."""
+    with incident.lock:
+        incident.counter_timer = None
+        if len(incident.ticket_ids) == incident.counter_count:
+            return
+        incident.counter_count = len(incident.ticket_ids)
+        incident.counter_updated_at = time.monotonic()
+        text = _counter_text(incident)
+        counter_ts = incident.counter_ts
+    try:
+        if counter_ts is None:
+            response = client.chat_postMessage(channel=channel, thread_ts=incident.root_ts, text=text)
+            with incident.lock:
+                incident.counter_ts = response["ts"]
+        else:
+            client.chat_update(channel=channel, ts=counter_ts, text=text)
+    except SlackApiError as e:
+        print(f"Error updating incident counter: {e}")
+
+def schedule_counter_update(client, channel, clusterer, incident):
+    """Refresh the incident counter at most once per counter_interval, coalescing updates in between."""
+    with incident.lock:
+        if incident.counter_timer is not None:
+            return
+        wait = clusterer.counter_interval - (time.monotonic() - incident.counter_updated_at)
+        if wait > 0:
+            incident.counter_timer = threading.Timer(wait, _update_counter, (client, channel, incident))
+            incident.counter_timer.daemon = True
+            incident.counter_timer.start()
+            return
+    _update_counter(client, channel, incident)
+
+def post_ticket_to_channel(client, channel, clusterer, ticket_id, issue_type, campaign, details, blocks, text, now):
+    """Post a ticket, collapsing it into an active incident thread when it looks like part of a burst.
+
+    The root message is never rewritten; the running count lives in a separate
+    thread reply. Returns the ts of the message carrying the ticket's action buttons.
+    """
+    incident, is_new = clusterer.find_or_open(issue_type, campaign, details, ticket_id, now)
+    if is_new:
+        try:
+            response = client.chat_postMessage(channel=channel, blocks=blocks, text=text)
+        except Exception:
+            clusterer.root_posted(incident, None)
+            raise
+        clusterer.root_posted(incident, response["ts"])
+        return response["ts"]
+
+    incident.ready.wait(timeout=10)
+    if incident.root_ts is None:
+        response = client.chat_postMessage(channel=channel, blocks=blocks, text=text)
+        return response["ts"]
+    response = client.chat_postMessage(channel=channel, thread_ts=incident.root_ts, blocks=blocks, text=text)
+    schedule_counter_update(client, channel, clusterer, incident)
+    return response["ts"]
@@ -0,0 +1,23 @@
+"""One-time migration of an existing plain tickets table to the partitioned layout.
+
+Deployments created before tickets was partitioned by month keep their plain table,
+and the nightly partition job skips it. Stop the web and worker processes, then run:
+
+    python migrate_partitions.py
+
+The old table is kept as tickets_unpartitioned; drop it once the row counts check out.
+"""
+import sys
+from database import init_db, migrate_tickets_to_partitioned
+
+if __name__ == "__main__":
+    try:
+        copied = migrate_tickets_to_partitioned()
+    except Exception as e:
+        print(f"Migration failed, nothing was changed: {e}")
+        sys.exit(1)
+    if copied is None:
+        print("tickets is already partitioned (or does not exist); nothing to migrate.")
+    else:
+        print(f"Copied {copied} tickets into the partitioned table.")
+    init_db()
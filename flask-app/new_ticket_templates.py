@@ -1,11 +1,20 @@
 import os
 import logging
+import runpy
 from flask import Flask, request, jsonify
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from datetime import datetime
 import pytz
-import json
+from serialization import loads, cached_fragment, slack_sdk_serializer_installed
+from bulk_actions import bulk_actions_bp, handle_bulk_submission
+from comment_history import handle_comment_history_action, handle_add_comment_submission
+from request_verification import verify_slack_signature
+from profiling import profiling_bp, profiled, stage
+from reports import reports_bp
+from auto_assign import auto_assign, track_transition
+from config import INCIDENT_WINDOW_MINUTES, INCIDENT_SIMILARITY_THRESHOLD, INCIDENT_COUNTER_INTERVAL_SECONDS
+from incident_clusterer import IncidentClusterer, post_ticket_to_channel
 
 # Configuration
 TIMEZONE = "America/New_York"  # Replace with your timezone
@@ -14,13 +23,20 @@ SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")  # Ensure this is set in your env
 
 # Initialize Flask app
 app = Flask(__name__)
+app.register_blueprint(profiling_bp)
+app.register_blueprint(reports_bp)
+app.register_blueprint(bulk_actions_bp)
 
-# Initialize Slack client
+# Initialize Slack client (slack_client, imported via bulk_actions, installs the serializer and timing hooks)
 client = WebClient(token=SLACK_BOT_TOKEN)
 
 # In-memory database (replace with real database in production)
 tickets_db = {}
 
+# Collapses bursts of similar tickets into one incident message
+incident_clusterer = IncidentClusterer(window_minutes=INCIDENT_WINDOW_MINUTES, threshold=INCIDENT_SIMILARITY_THRESHOLD,
+                                       counter_interval=INCIDENT_COUNTER_INTERVAL_SECONDS)
+
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -105,7 +121,7 @@ def build_new_ticket_modal():
         ]
     }
 
-def get_system_ticket_blocks(ticket_id, campaign, issue_type, priority, user_id, details, salesforce_link, file_url):
+def get_system_ticket_blocks(ticket_id, campaign, issue_type, priority, user_id, details, salesforce_link, file_url, assigned_to="Unassigned"):
     """Returns the blocks for posting a new ticket to the systems channel"""
     blocks = [
         {
@@ -149,9 +165,20 @@ def get_system_ticket_blocks(ticket_id, campaign, issue_type, priority, user_id,
             "text": {"type": "mrkdwn", "text": f"🖼️ *Screenshot:* <{file_url}|View Screenshot>"}
         })
 
+    # Show the auto-assigned agent, if any
+    if assigned_to != "Unassigned":
+        blocks.append({
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"👤 *Auto-assigned to:* <@{assigned_to}>"}]
+        })
+
     # Add divider before actions
     blocks.append({"type": "divider"})
 
+    if assigned_to != "Unassigned":
+        blocks.append(get_ticket_updated_blocks(ticket_id, priority, issue_type, assigned_to, "Open")[-1])
+        return blocks
+
     # Add Assign to Me button with the specified emoji
     blocks.append({
         "type": "actions",
@@ -272,6 +299,7 @@ def assign_to_me(ticket_id, user_id):
         logger.warning(f"Ticket {ticket_id} is not open")
         return
 
+    track_transition(ticket["assigned_to"], ticket["status"], user_id, "In Progress")
     ticket["assigned_to"] = user_id
     ticket["status"] = "In Progress"
     ticket["updated_at"] = datetime.now(pytz.timezone(TIMEZONE))
@@ -298,6 +326,7 @@ def resolve_ticket(ticket_id):
         logger.warning(f"Ticket {ticket_id} cannot be resolved from its current status")
         return
 
+    track_transition(ticket["assigned_to"], ticket["status"], ticket["assigned_to"], "Resolved")
     ticket["status"] = "Resolved"
     ticket["updated_at"] = datetime.now(pytz.timezone(TIMEZONE))
 
@@ -323,6 +352,7 @@ def close_ticket(ticket_id):
         logger.warning(f"Ticket {ticket_id} cannot be closed from its current status")
         return
 
+    track_transition(ticket["assigned_to"], ticket["status"], ticket["assigned_to"], "Closed")
     ticket["status"] = "Closed"
     ticket["updated_at"] = datetime.now(pytz.timezone(TIMEZONE))
 
@@ -337,30 +367,40 @@ def close_ticket(ticket_id):
     )
     logger.info(f"Ticket {ticket_id} closed")
 
-@app.route('/new-ticket', methods=['POST'])
-def new_ticket():
-    """Handle the /new-ticket command to open the modal."""
-    trigger_id = request.form.get('trigger_id')
+def open_new_ticket_modal(trigger_id):
+    """Open the new ticket modal. Returns an error message, or None on success."""
     if not trigger_id:
-        return jsonify({"text": "Error: No trigger_id"}), 200
+        return "Error: No trigger_id"
     try:
-        modal = build_new_ticket_modal()
+        # The modal never changes, so serialize it once and reuse the bytes; stdlib json
+        # (unsupported slack_sdk version) cannot encode fragments, so it gets the plain dict
+        if slack_sdk_serializer_installed():
+            modal = cached_fragment("new_ticket_modal", build_new_ticket_modal)
+        else:
+            modal = build_new_ticket_modal()
         client.views_open(trigger_id=trigger_id, view=modal)
-        return "", 200
+        return None
     except SlackApiError as e:
         logger.error(f"Error opening modal: {e}")
-        return jsonify({"text": "Error opening modal"}), 200
+        return "Error opening modal"
 
-@app.route('/slack/interactivity', methods=['POST'])
-def slack_interactivity():
-    """Handle Slack interactivity (button clicks and modal submissions)."""
-    payload = json.loads(request.form["payload"])
+def dispatch_interactivity(payload):
+    """Route an interactivity payload (button click or modal submission) to its handler.
+
+    Shared by the HTTP endpoint and the Socket Mode runner.
+    """
     if payload["type"] == "view_submission":
         # Handle modal submission
-        handle_new_ticket_submission(payload)
-        return {"response_action": "clear"}
+        if payload["view"].get("callback_id") == "bulk_ticket_actions":
+            handle_bulk_submission(payload)
+        elif payload["view"].get("callback_id") == "add_ticket_comment":
+            handle_add_comment_submission(payload)
+        else:
+            handle_new_ticket_submission(payload)
     elif payload["type"] == "block_actions":
         # Handle button clicks
+        if handle_comment_history_action(payload, client):
+            return
         action_id = payload["actions"][0]["action_id"]
         ticket_id = int(payload["actions"][0]["value"])
         user_id = payload["user"]["id"]
@@ -371,6 +411,24 @@ def slack_interactivity():
         elif action_id.startswith("close_"):
             close_ticket(ticket_id)
         # Add more actions as needed (e.g., reassign)
+
+@app.route('/new-ticket', methods=['POST'])
+@verify_slack_signature
+def new_ticket():
+    """Handle the /new-ticket command to open the modal."""
+    error = open_new_ticket_modal(request.form.get('trigger_id'))
+    if error:
+        return jsonify({"text": error}), 200
+    return "", 200
+
+@app.route('/slack/interactivity', methods=['POST'])
+@verify_slack_signature
+@profiled("slack_interactivity")
+def slack_interactivity():
+    """Handle Slack interactivity (button clicks and modal submissions)."""
+    payload = loads(request.form["payload"])
+    dispatch_interactivity(payload)
+    if payload["type"] == "block_actions":
         return "", 200
     return jsonify({"response_action": "clear"})
 
@@ -389,6 +447,9 @@ def handle_new_ticket_submission(payload):
     # Generate ticket ID (for in-memory DB)
     ticket_id = len(tickets_db) + 1
 
+    # Pick the least-loaded skilled agent (None when auto-assignment is off)
+    assigned_to = auto_assign(campaign, issue_type) or "Unassigned"
+
     # Insert into database
     tickets_db[ticket_id] = {
         "created_by": user_id,
@@ -396,7 +457,7 @@ def handle_new_ticket_submission(payload):
         "issue_type": issue_type,
         "priority": priority,
         "status": "Open",
-        "assigned_to": "Unassigned",
+        "assigned_to": assigned_to,
         "details": details,
         "salesforce_link": salesforce_link,
         "file_url": file_url,
@@ -405,10 +466,13 @@ def handle_new_ticket_submission(payload):
         "message_ts": None  # Will be updated after posting
     }
 
-    # Post to system channel
-    message_blocks = get_system_ticket_blocks(ticket_id, campaign, issue_type, priority, user_id, details, salesforce_link, file_url)
-    response = client.chat_postMessage(channel=SYSTEM_ISSUES_CHANNEL, blocks=message_blocks, text=f"New Ticket T{ticket_id:03d}")
-    tickets_db[ticket_id]["message_ts"] = response["ts"]
+    # Post to system channel (as a thread reply if it belongs to an ongoing incident)
+    with stage("render"):
+        message_blocks = get_system_ticket_blocks(ticket_id, campaign, issue_type, priority, user_id, details, salesforce_link, file_url, assigned_to)
+    tickets_db[ticket_id]["message_ts"] = post_ticket_to_channel(
+        client, SYSTEM_ISSUES_CHANNEL, incident_clusterer, ticket_id, issue_type, campaign, details,
+        message_blocks, f"New Ticket T{ticket_id:03d}", now
+    )
 
     # Send confirmation DM
     confirmation_blocks = get_agent_confirmation_blocks(ticket_id, campaign, issue_type, priority)
@@ -425,4 +489,5 @@ def send_dm(user_id, text, blocks=None):
         logger.error(f"Error sending DM: {e}")
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    # Serve through the app factory so /health, /ready and schema setup are included
+    runpy.run_module("app", run_name="__main__")
\ No newline at end of file
@@ -0,0 +1,229 @@
+import heapq
+import hmac
+import itertools
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+import psycopg2.extensions
+from flask import Blueprint, Response, jsonify, request
+from config import ADMIN_TOKEN, PROFILING_SAMPLE_RATE, PROFILING_SLOW_TRACES, PROFILING_INTERVAL_MS
+
+class Trace:
+    """Timings and sampled stacks for one profiled request or scheduler run."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name):
+        self.id = next(self._ids)
+        self.name = name
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.stages = {}
+        self.stacks = Counter()
+        self._stacks_lock = threading.Lock()
+
+    def add_stage(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds * 1000
+
+    def add_sample(self, stack):
+        with self._stacks_lock:
+            self.stacks[stack] += 1
+
+    def stack_counts(self):
+        """A copy of the sampled stacks; the sampler may still be writing to a just-finished trace."""
+        with self._stacks_lock:
+            return dict(self.stacks)
+
+    def to_dict(self):
+        stages = {k: round(v, 2) for k, v in self.stages.items()}
+        stages["other"] = round(max(self.duration_ms - sum(self.stages.values()), 0.0), 2)
+        return {"id": self.id, "name": self.name, "started_at": self.started_at,
+                "duration_ms": round(self.duration_ms, 2), "stages_ms": stages, "samples": sum(self.stack_counts().values())}
+
+class Profiler:
+    """Runtime-switchable sampling profiler.
+
+    When enabled, a fraction of profiled calls get a Trace. One sampler thread
+    snapshots the stacks of threads with an active trace every interval_ms, and
+    only the slowest max_traces traces are kept.
+    """
+
+    def __init__(self, sample_rate=0.1, max_traces=20, interval_ms=5):
+        self.enabled = False
+        self.sample_rate = sample_rate
+        self.max_traces = max_traces
+        self.interval = interval_ms / 1000
+        self._active = {}
+        self._slowest = []
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def configure(self, enabled, sample_rate=None):
+        with self._lock:
+            self.enabled = enabled
+            if sample_rate is not None:
+                self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+            if enabled and (self._sampler is None or not self._sampler.is_alive()):
+                self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+                self._sampler.start()
+
+    def clear(self):
+        with self._lock:
+            self._slowest = []
+
+    def _sample_loop(self):
+        while self.enabled:
+            time.sleep(self.interval)
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, trace in list(self._active.items()):
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack:
+                    trace.add_sample(";".join(reversed(stack)))
+
+    def current(self):
+        return self._active.get(threading.get_ident())
+
+    @contextmanager
+    def trace(self, name):
+        if not self.enabled or random.random() >= self.sample_rate or self.current() is not None:
+            yield None
+            return
+        trace = Trace(name)
+        thread_id = threading.get_ident()
+        self._active[thread_id] = trace
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.duration_ms = (time.perf_counter() - started) * 1000
+            self._active.pop(thread_id, None)
+            with self._lock:
+                entry = (trace.duration_ms, trace.id, trace)
+                if len(self._slowest) < self.max_traces:
+                    heapq.heappush(self._slowest, entry)
+                else:
+                    heapq.heappushpop(self._slowest, entry)
+
+    def slowest(self):
+        with self._lock:
+            return [t for _, _, t in sorted(self._slowest, reverse=True)]
+
+    def folded_stacks(self, trace_id=None):
+        """Collapsed stacks ("frame;frame;frame count" per line) for flamegraph.pl or speedscope."""
+        merged = Counter()
+        for trace in self.slowest():
+            if trace_id is None or trace.id == trace_id:
+                for stack, count in trace.stack_counts().items():
+                    merged[f"{trace.name};{stack}"] += count
+        return "\n".join(f"{stack} {count}" for stack, count in merged.most_common()) + "\n"
+
+profiler = Profiler(sample_rate=PROFILING_SAMPLE_RATE, max_traces=PROFILING_SLOW_TRACES, interval_ms=PROFILING_INTERVAL_MS)
+
+@contextmanager
+def stage(name):
+    """Attribute the enclosed time to a stage (db, slack, render) of the current trace, if any."""
+    trace = profiler.current()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, time.perf_counter() - started)
+
+def profiled(name):
+    """Decorator: trace a sampled fraction of calls while profiling is enabled."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiler.trace(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """Cursor that records query time into the "db" stage of the current trace."""
+
+    def execute(self, query, vars=None):
+        with stage("db"):
+            return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        with stage("db"):
+            return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        with stage("db"):
+            return super().copy_expert(sql, file, size)
+
+def install_slack_timing():
+    """Record every Slack Web API call into the "slack" stage of the current trace."""
+    from slack_sdk.web.base_client import BaseClient
+    if getattr(BaseClient.api_call, "_profiled", False):
+        return
+    original = BaseClient.api_call
+
+    @wraps(original)
+    def api_call(self, *args, **kwargs):
+        with stage("slack"):
+            return original(self, *args, **kwargs)
+    api_call._profiled = True
+    BaseClient.api_call = api_call
+
+profiling_bp = Blueprint("profiling", __name__, url_prefix="/admin/profiling")
+
+def admin_only(view):
+    """Require "Authorization: Bearer <ADMIN_TOKEN>"; everything is refused when ADMIN_TOKEN is unset."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        auth = request.headers.get("Authorization", "")
+        supplied = auth[len("Bearer "):].strip() if auth.startswith("Bearer ") else ""
+        if not ADMIN_TOKEN or not hmac.compare_digest(supplied, ADMIN_TOKEN):
+            return jsonify({"error": "forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+@profiling_bp.route('', methods=['GET'])
+@admin_only
+def profiling_status():
+    return jsonify({"enabled": profiler.enabled, "sample_rate": profiler.sample_rate,
+                    "max_traces": profiler.max_traces, "traces": len(profiler.slowest())})
+
+@profiling_bp.route('', methods=['POST'])
+@admin_only
+def profiling_configure():
+    """Switch profiling on or off. JSON: {"enabled": bool, optional "sample_rate": 0..1, optional "clear": bool}."""
+    data = request.get_json(silent=True) or {}
+    if data.get("clear"):
+        profiler.clear()
+    try:
+        profiler.configure(bool(data.get("enabled", profiler.enabled)), data.get("sample_rate"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "sample_rate must be a number"}), 400
+    return profiling_status()
+
+@profiling_bp.route('/traces', methods=['GET'])
+@admin_only
+def profiling_traces():
+    """The slowest captured traces with per-stage timings, slowest first."""
+    return jsonify({"traces": [t.to_dict() for t in profiler.slowest()]})
+
+@profiling_bp.route('/flamegraph', methods=['GET'])
+@admin_only
+def profiling_flamegraph():
+    """Collapsed stacks for all kept traces, or one trace with ?trace=<id>."""
+    trace_id = request.args.get("trace", type=int)
+    return Response(profiler.folded_stacks(trace_id), mimetype="text/plain",
+                    headers={"Content-Disposition": "attachment; filename=profile.folded"})
@@ -0,0 +1,22 @@
+from datetime import date
+from flask import Blueprint, jsonify, request
+from event_log import ticket_lifecycle_stats
+from profiling import admin_only
+
+reports_bp = Blueprint("reports", __name__, url_prefix="/admin/reports")
+
+@reports_bp.route('/lifecycle', methods=['GET'])
+@admin_only
+def lifecycle_report():
+    """Average hours to assign and to resolve. Optional ?start=YYYY-MM-DD&end=YYYY-MM-DD on ticket creation date."""
+    try:
+        start = date.fromisoformat(request.args["start"]) if request.args.get("start") else None
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else None
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD"}), 400
+    try:
+        stats = ticket_lifecycle_stats(start, end)
+    except Exception as e:
+        print(f"Error computing ticket lifecycle stats: {e}")
+        return jsonify({"error": "database unavailable"}), 503
+    return jsonify(dict(stats, start=start.isoformat() if start else None, end=end.isoformat() if end else None))
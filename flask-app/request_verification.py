@@ -0,0 +1,60 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify
+from config import SLACK_SIGNING_SECRET, SLACK_MAX_BODY_BYTES, SLACK_TIMESTAMP_TOLERANCE_SECONDS
+
+class ReplayCache:
+    """Remembers recently seen request signatures until they fall out of the timestamp window."""
+
+    def __init__(self, ttl_seconds, max_entries=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check_and_add(self, signature, now=None):
+        """Return True if the signature is new (and remember it), False if it is a replay."""
+        now = now or time.time()
+        with self._lock:
+            while self._seen and (next(iter(self._seen.values())) < now - self.ttl_seconds or len(self._seen) >= self.max_entries):
+                self._seen.popitem(last=False)
+            if signature in self._seen:
+                return False
+            self._seen[signature] = now
+            return True
+
+replay_cache = ReplayCache(ttl_seconds=SLACK_TIMESTAMP_TOLERANCE_SECONDS * 2)
+
+def is_valid_slack_request(body, timestamp, signature, signing_secret=SLACK_SIGNING_SECRET, now=None):
+    """Check the timestamp window and the v0 HMAC-SHA256 signature of a raw request body."""
+    if not signing_secret or not timestamp or not signature:
+        return False
+    try:
+        if abs((now or time.time()) - int(timestamp)) > SLACK_TIMESTAMP_TOLERANCE_SECONDS:
+            return False
+    except ValueError:
+        return False
+    basestring = b"v0:" + timestamp.encode() + b":" + body
+    expected = "v0=" + hmac.new(signing_secret.encode(), basestring, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def verify_slack_signature(view):
+    """Reject oversized, unsigned, stale or replayed requests before the form body is parsed."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.content_length is None or request.content_length > SLACK_MAX_BODY_BYTES:
+            return jsonify({"error": "payload too large"}), 413
+        timestamp = request.headers.get("X-Slack-Request-Timestamp")
+        signature = request.headers.get("X-Slack-Signature")
+        # Cache the raw body so request.form can still be parsed from it afterwards
+        body = request.get_data(cache=True)
+        if not is_valid_slack_request(body, timestamp, signature):
+            return jsonify({"error": "invalid signature"}), 401
+        if not replay_cache.check_and_add(signature):
+            return jsonify({"error": "replayed request"}), 401
+        return view(*args, **kwargs)
+    return wrapper
@@ -1,14 +1,16 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, timedelta
 import pytz
-from database import db_pool
+from database import db_read_pool, ensure_ticket_partitions, archive_closed_tickets
 from slack_client import client
-from config import TIMEZONE, SYSTEM_ISSUES_CHANNEL
-
-scheduler = BackgroundScheduler(timezone=pytz.timezone(TIMEZONE))
+from auto_assign import reseed_assigner
+from user_directory import user_directory, resolve_names
+from profiling import profiled
+from config import TIMEZONE, SYSTEM_ISSUES_CHANNEL, AUTO_ASSIGN_ENABLED, USER_DIRECTORY_TTL_SECONDS
 
+@profiled("check_overdue_tickets")
 def check_overdue_tickets():
-    conn = db_pool.getconn()
+    conn = db_read_pool.getconn()
     try:
         cur = conn.cursor()
         seven_days_ago = datetime.now(pytz.timezone(TIMEZONE)) - timedelta(days=7)
@@ -18,10 +20,11 @@ def check_overdue_tickets():
             if assignee_id and assignee_id != 'Unassigned':
                 client.chat_postMessage(channel=assignee_id, text=f"⏰ Reminder: Ticket T{ticket_id} is overdue. Please review.")
     finally:
-        db_pool.putconn(conn)
+        db_read_pool.putconn(conn)
 
+@profiled("check_stale_tickets")
 def check_stale_tickets():
-    conn = db_pool.getconn()
+    conn = db_read_pool.getconn()
     try:
         cur = conn.cursor()
         three_days_ago = datetime.now(pytz.timezone(TIMEZONE)) - timedelta(days=3)
@@ -31,25 +34,54 @@ def check_stale_tickets():
             (three_days_ago,)
         )
         stale_tickets = cur.fetchall()
-        if stale_tickets:
-            blocks = [
-                {"type": "header", "text": {"type": "plain_text", "text": "⚠️ Stale Tickets Alert", "emoji": True}},
-                {"type": "section", "text": {"type": "mrkdwn", "text": "The following tickets have had no updates for 3+ days:"}}
-            ]
-            for ticket in stale_tickets:
-                ticket_id, created_by, campaign, issue_type, priority, status, assigned_to, updated_at = ticket
-                days_stale = (datetime.now(pytz.timezone(TIMEZONE)) - updated_at).days
-                blocks.extend([
-                    {"type": "divider"},
-                    {"type": "section", "text": {"type": "mrkdwn",
-                                                  "text": f"*T{ticket_id:03d}* | {priority} Priority | {status} | {days_stale} days stale\n"
-                                                          f">*Issue:* {issue_type}\n"
-                                                          f">*Assigned to:* {f'<@{assigned_to}>' if assigned_to != 'Unassigned' else 'Unassigned'}\n"
-                                                          f">*Campaign:* {campaign}"}}
-                ])
-            client.chat_postMessage(channel=SYSTEM_ISSUES_CHANNEL, blocks=blocks)
     finally:
-        db_pool.putconn(conn)
+        db_read_pool.putconn(conn)
+
+    if not stale_tickets:
+        return
+    name = resolve_names()
+    blocks = [
+        {"type": "header", "text": {"type": "plain_text", "text": "⚠️ Stale Tickets Alert", "emoji": True}},
+        {"type": "section", "text": {"type": "mrkdwn", "text": "The following tickets have had no updates for 3+ days:"}}
+    ]
+    for ticket in stale_tickets:
+        ticket_id, created_by, campaign, issue_type, priority, status, assigned_to, updated_at = ticket
+        days_stale = (datetime.now(pytz.timezone(TIMEZONE)) - updated_at).days
+        blocks.extend([
+            {"type": "divider"},
+            {"type": "section", "text": {"type": "mrkdwn",
+                                          "text": f"*T{ticket_id:03d}* | {priority} Priority | {status} | {days_stale} days stale\n"
+                                                  f">*Issue:* {issue_type}\n"
+                                                  f">*Assigned to:* {name(assigned_to) if assigned_to != 'Unassigned' else 'Unassigned'}\n"
+                                                  f">*Campaign:* {campaign}"}}
+        ])
+    client.chat_postMessage(channel=SYSTEM_ISSUES_CHANNEL, blocks=blocks)
+
+@profiled("maintain_ticket_partitions")
+def maintain_ticket_partitions():
+    """Create upcoming monthly partitions and move old closed tickets to the archive."""
+    try:
+        ensure_ticket_partitions()
+    except Exception as e:
+        print(f"Error creating ticket partitions: {e}")
+    try:
+        archived = archive_closed_tickets()
+        if archived:
+            print(f"Archived {archived} closed tickets")
+    except Exception as e:
+        print(f"Error archiving closed tickets: {e}")
+
+_scheduler = None
 
-scheduler.add_job(check_overdue_tickets, "interval", hours=24)
-scheduler.add_job(check_stale_tickets, "interval", hours=24, start_date=datetime.now() + timedelta(minutes=30))
\ No newline at end of file
+def get_scheduler():
+    """Build the background scheduler and its jobs on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = BackgroundScheduler(timezone=pytz.timezone(TIMEZONE))
+        _scheduler.add_job(check_overdue_tickets, "interval", hours=24)
+        _scheduler.add_job(check_stale_tickets, "interval", hours=24, start_date=datetime.now() + timedelta(minutes=30))
+        _scheduler.add_job(maintain_ticket_partitions, "cron", hour=2, minute=15)
+        _scheduler.add_job(user_directory.refresh, "interval", seconds=USER_DIRECTORY_TTL_SECONDS)
+        if AUTO_ASSIGN_ENABLED:
+            _scheduler.add_job(reseed_assigner, "interval", minutes=15)
+    return _scheduler
@@ -0,0 +1,94 @@
+"""JSON encode/decode for Slack payloads: orjson when installed, stdlib json otherwise."""
+import json
+import types
+import uuid
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+class Fragment:
+    """A JSON value serialized once and embedded verbatim wherever it appears in a payload."""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw):
+        self.raw = raw if isinstance(raw, bytes) else raw.encode("utf-8")
+
+_fragment_cache = {}
+
+def cached_fragment(key, builder):
+    """Serialize builder() once per key and reuse the bytes for every later payload."""
+    fragment = _fragment_cache.get(key)
+    if fragment is None:
+        fragment = _fragment_cache[key] = Fragment(dumps_bytes(builder()))
+    return fragment
+
+def _encode(obj, default):
+    if orjson is not None:
+        return orjson.dumps(obj, default=default)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+if orjson is not None and hasattr(orjson, "Fragment"):
+    def _native_default(obj):
+        if isinstance(obj, Fragment):
+            return orjson.Fragment(obj.raw)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=_native_default)
+else:
+    def dumps_bytes(obj):
+        # Encode fragments as unique placeholder strings, then splice the raw bytes in
+        fragments = []
+        token = uuid.uuid4().hex
+
+        def default(o):
+            if isinstance(o, Fragment):
+                fragments.append(o.raw)
+                return f"__fragment_{token}_{len(fragments) - 1}__"
+            raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+        encoded = _encode(obj, default)
+        for i, raw in enumerate(fragments):
+            encoded = encoded.replace(f'"__fragment_{token}_{i}__"'.encode("utf-8"), raw)
+        return encoded
+
+def loads(data):
+    return (orjson or json).loads(data)
+
+def dumps(obj, **kwargs):
+    """Compact json.dumps(obj) returning str. json.dumps keyword arguments are not supported."""
+    if kwargs:
+        raise TypeError(f"serialization.dumps() does not support: {', '.join(sorted(kwargs))}")
+    return dumps_bytes(obj).decode("utf-8")
+
+# Stands in for the json module inside slack_sdk so outbound API bodies use this serializer
+json_shim = types.SimpleNamespace(dumps=dumps, loads=loads, decoder=json.decoder, JSONDecodeError=json.JSONDecodeError)
+
+# slack_sdk releases whose base_client only calls json.dumps(obj) and json.loads(str)
+SUPPORTED_SLACK_SDK_VERSIONS = ("3.21.",)
+
+def install_slack_sdk_serializer():
+    """Route slack_sdk's JSON request bodies and response parsing through this module.
+
+    Call once at startup (slack_client does). Returns False and leaves slack_sdk
+    untouched on versions the shim has not been checked against.
+    """
+    from slack_sdk.version import __version__ as slack_sdk_version
+    from slack_sdk.web import base_client
+    if base_client.json is json_shim:
+        return True
+    if not slack_sdk_version.startswith(SUPPORTED_SLACK_SDK_VERSIONS):
+        print(f"slack_sdk {slack_sdk_version} is not a supported version for the fast serializer; using stdlib json")
+        return False
+    base_client.json = json_shim
+    return True
+
+def slack_sdk_serializer_installed():
+    """Whether slack_sdk currently encodes request bodies through json_shim, and so accepts Fragment values."""
+    from slack_sdk.web import base_client
+    return base_client.json is json_shim
@@ -14,5 +14,6 @@ setup(
         "pytz==2022.7.1",
         "requests==2.28.2",
         "gunicorn==20.1.0",
+        "orjson==3.9.15",
     ],
 )
@@ -1,7 +1,13 @@
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from config import SLACK_BOT_TOKEN
+from serialization import install_slack_sdk_serializer
+from profiling import install_slack_timing
 
+# The only place the slack_sdk hooks are installed; they apply to every WebClient in the process.
+# API bodies use the fast serializer (orjson when installed) and calls are timed by the profiler.
+install_slack_sdk_serializer()
+install_slack_timing()
 client = WebClient(token=SLACK_BOT_TOKEN)
 
 def send_dm(user_id, text, blocks=None):
@@ -0,0 +1,76 @@
+import threading
+from slack_sdk.socket_mode import SocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+from config import SLACK_APP_TOKEN, SOCKET_MODE_URL, SOCKET_MODE_WORKERS
+from bulk_actions import open_bulk_actions_modal
+from new_ticket_templates import client, logger, open_new_ticket_modal, dispatch_interactivity
+
+# Slash command name -> handler(payload) returning an error message or None
+SLASH_COMMANDS = {
+    "/new-ticket": lambda payload: open_new_ticket_modal(payload.get("trigger_id")),
+    "/bulk-tickets": lambda payload: open_bulk_actions_modal(payload.get("trigger_id"), payload.get("user_id")),
+}
+
+class LocalSocketModeClient(SocketModeClient):
+    """SocketModeClient that connects to a fixed URL, e.g. a local websocket stand-in, instead of apps.connections.open."""
+
+    def __init__(self, url, **kwargs):
+        self.fixed_url = url
+        super().__init__(**kwargs)
+
+    def issue_new_wss_url(self):
+        return self.fixed_url
+
+def ack_payload(req: SocketModeRequest):
+    """The body Slack expects in the acknowledgement for this request."""
+    if req.type == "interactive" and req.payload.get("type") == "view_submission":
+        return {"response_action": "clear"}
+    return None
+
+def handle_request(req: SocketModeRequest):
+    """Run the same handlers the HTTP endpoints use for one Socket Mode envelope."""
+    try:
+        if req.type == "slash_commands":
+            handler = SLASH_COMMANDS.get(req.payload.get("command"))
+            if handler is None:
+                logger.warning(f"Unhandled slash command: {req.payload.get('command')}")
+                return
+            error = handler(req.payload)
+            if error:
+                client.chat_postEphemeral(channel=req.payload["channel_id"], user=req.payload["user_id"], text=error)
+        elif req.type == "interactive":
+            dispatch_interactivity(req.payload)
+    except Exception as e:
+        logger.error(f"Error handling Socket Mode {req.type} request: {e}")
+
+def create_socket_client(app_token=SLACK_APP_TOKEN, url=SOCKET_MODE_URL, concurrency=SOCKET_MODE_WORKERS):
+    """Build a Socket Mode client that acks each envelope immediately, then runs its handler.
+
+    Listeners already run on the client's own pool of `concurrency` worker threads.
+    """
+    if url:
+        socket_client = LocalSocketModeClient(url, app_token=app_token or "xapp-local", web_client=client,
+                                              concurrency=concurrency)
+    else:
+        socket_client = SocketModeClient(app_token=app_token, web_client=client, concurrency=concurrency)
+
+    def process(sm_client, req):
+        sm_client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id, payload=ack_payload(req)))
+        handle_request(req)
+
+    socket_client.socket_mode_request_listeners.append(process)
+    return socket_client
+
+def run():
+    """Connect over Socket Mode and serve until the process is stopped."""
+    socket_client = create_socket_client()
+    socket_client.connect()
+    logger.info(f"Socket Mode connected with {SOCKET_MODE_WORKERS} workers")
+    try:
+        threading.Event().wait()
+    finally:
+        socket_client.close()
+
+if __name__ == "__main__":
+    run()
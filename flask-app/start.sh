@@ -38,8 +38,11 @@ echo "Starting application..."
 if [ "$PROCESS_TYPE" = "worker" ]; then
     echo "Starting in worker mode..."
     python app.py
+elif [ "$PROCESS_TYPE" = "socket" ]; then
+    echo "Starting in Socket Mode..."
+    python socket_mode.py
 else
     echo "Starting in web mode with Gunicorn..."
     # Use the full path to gunicorn with detailed error logging
-    $(which gunicorn) app:app --bind 0.0.0.0:$PORT --log-level debug --capture-output --error-logfile - --access-logfile -
+    $(which gunicorn) "app:create_app()" --bind 0.0.0.0:$PORT --log-level debug --capture-output --error-logfile - --access-logfile -
 fi
@@ -0,0 +1,43 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-test")
+
+from slack_sdk.web import base_client
+import new_ticket_templates
+import serialization
+
+class NewTicketModalSerializationTest(unittest.TestCase):
+    """views.open must encode with whichever json module slack_sdk ends up using."""
+
+    def open_modal(self):
+        bodies = []
+
+        def fake_http(url, req):
+            bodies.append(json.loads(req.data))
+            return {"status": 200, "headers": {}, "body": '{"ok": true}'}
+
+        with mock.patch.object(new_ticket_templates.client, "_perform_urllib_http_request_internal", side_effect=fake_http):
+            error = new_ticket_templates.open_new_ticket_modal("trigger-1")
+        self.assertIsNone(error)
+        self.assertEqual(bodies[0]["trigger_id"], "trigger-1")
+        self.assertEqual(bodies[0]["view"], new_ticket_templates.build_new_ticket_modal())
+
+    def test_modal_with_shim_installed(self):
+        with mock.patch.object(base_client, "json", serialization.json_shim):
+            self.assertTrue(serialization.slack_sdk_serializer_installed())
+            self.open_modal()
+
+    def test_modal_falls_back_to_plain_dict_without_shim(self):
+        with mock.patch.object(base_client, "json", json):
+            self.assertFalse(serialization.slack_sdk_serializer_installed())
+            self.open_modal()
+
+    def test_dumps_rejects_keyword_arguments(self):
+        with self.assertRaises(TypeError):
+            serialization.dumps({}, indent=2)
+
+if __name__ == "__main__":
+    unittest.main()
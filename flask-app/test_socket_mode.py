@@ -0,0 +1,115 @@
+import base64
+import hashlib
+import json
+import os
+import socket
+import struct
+import threading
+import unittest
+from unittest import mock
+
+os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-test")
+
+import socket_mode
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+class LocalWebSocketServer:
+    """Single-connection websocket stand-in: sends one envelope and collects the client's text frames."""
+
+    def __init__(self, envelope):
+        self.envelope = envelope
+        self.received = []
+        self.got_ack = threading.Event()
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(1)
+        self.url = f"ws://127.0.0.1:{self._sock.getsockname()[1]}/"
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _recv_exact(self, conn, n):
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("client closed the connection")
+            data += chunk
+        return data
+
+    def _read_frame(self, conn):
+        first, second = self._recv_exact(conn, 2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if second & 0x80 else b"\0\0\0\0"
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(conn, length)))
+        return first & 0x0F, payload
+
+    def _send_frame(self, conn, opcode, payload):
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        else:
+            header += bytes([126]) + struct.pack("!H", len(payload))
+        conn.sendall(header + payload)
+
+    def _serve(self):
+        conn, _ = self._sock.accept()
+        with conn:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(1024)
+            headers = dict(line.split(": ", 1) for line in request.decode().split("\r\n")[1:] if ": " in line)
+            accept = base64.b64encode(hashlib.sha1((headers["Sec-WebSocket-Key"] + WEBSOCKET_GUID).encode()).digest())
+            conn.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                         b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+            self._send_frame(conn, 0x1, json.dumps(self.envelope).encode())
+            try:
+                while True:
+                    opcode, payload = self._read_frame(conn)
+                    if opcode == 0x9:
+                        self._send_frame(conn, 0xA, payload)
+                    elif opcode == 0x1:
+                        self.received.append(json.loads(payload))
+                        self.got_ack.set()
+                    elif opcode == 0x8:
+                        return
+            except (ConnectionError, OSError):
+                pass
+
+    def close(self):
+        self._sock.close()
+
+class SocketModeRunnerTest(unittest.TestCase):
+    def test_envelope_is_acked_and_dispatched(self):
+        envelope = {
+            "envelope_id": "env-1",
+            "type": "slash_commands",
+            "accepts_response_payload": True,
+            "payload": {"command": "/new-ticket", "trigger_id": "trigger-1", "user_id": "U1", "channel_id": "C1"},
+        }
+        server = LocalWebSocketServer(envelope)
+        handled = threading.Event()
+        calls = []
+
+        def fake_handler(payload):
+            calls.append(payload)
+            handled.set()
+
+        with mock.patch.dict(socket_mode.SLASH_COMMANDS, {"/new-ticket": fake_handler}):
+            socket_client = socket_mode.create_socket_client(app_token="xapp-test", url=server.url, concurrency=2)
+            socket_client.connect()
+            try:
+                self.assertTrue(server.got_ack.wait(5), "no ack received")
+                self.assertTrue(handled.wait(5), "handler was not called")
+            finally:
+                socket_client.close()
+                server.close()
+
+        self.assertEqual(server.received[0]["envelope_id"], "env-1")
+        self.assertEqual(calls[0]["trigger_id"], "trigger-1")
+
+if __name__ == "__main__":
+    unittest.main()
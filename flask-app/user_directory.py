@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import datetime
+import pytz
+from psycopg2.extras import execute_values
+from slack_sdk.errors import SlackApiError
+from config import USER_DIRECTORY_TTL_SECONDS
+from database import db_pool, db_read_pool
+from slack_client import client
+
+class UserDirectory:
+    """In-memory user_id -> display name map, filled in bulk from users.list and persisted in Postgres.
+
+    Lookups never call Slack; a stale or empty directory keeps serving its current
+    names (or raw IDs) while one background thread refreshes it. After a failed
+    refresh the next attempt waits retry_seconds.
+    """
+
+    def __init__(self, ttl_seconds, retry_seconds=60):
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._names = {}
+        self._loaded_at = 0.0
+        self._db_loaded = False
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+
+    def _display_name(self, member):
+        profile = member.get("profile", {})
+        return profile.get("display_name") or profile.get("real_name") or member.get("real_name") or member.get("name") or member["id"]
+
+    def fetch_from_slack(self, max_rate_limit_waits=20):
+        """Page through users.list and return {user_id: display_name}.
+
+        users.list is rate limited (Tier 2); on a 429 the same page is retried after
+        Retry-After seconds, so a large workspace is fetched in one pass.
+        """
+        names = {}
+        cursor = None
+        waits = 0
+        while True:
+            try:
+                response = client.users_list(limit=200, cursor=cursor)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or waits >= max_rate_limit_waits:
+                    raise
+                waits += 1
+                retry_after = int(e.response.headers.get("Retry-After", 30))
+                print(f"users.list rate limited after {len(names)} users; retrying in {retry_after}s")
+                time.sleep(retry_after)
+                continue
+            for member in response.get("members", []):
+                if not member.get("deleted"):
+                    names[member["id"]] = self._display_name(member)
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return names
+
+    def load_from_db(self):
+        """Return ({user_id: display_name}, age_seconds) from the slack_users table."""
+        conn = db_read_pool.getconn()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT user_id, display_name, EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - updated_at) FROM slack_users")
+            rows = cur.fetchall()
+            if not rows:
+                return {}, None
+            return {r[0]: r[1] for r in rows}, min(float(r[2]) for r in rows)
+        finally:
+            db_read_pool.putconn(conn)
+
+    def save_to_db(self, names):
+        now = datetime.now(pytz.utc)
+        conn = db_pool.getconn()
+        try:
+            cur = conn.cursor()
+            execute_values(
+                cur,
+                "INSERT INTO slack_users (user_id, display_name, updated_at) VALUES %s "
+                "ON CONFLICT (user_id) DO UPDATE SET display_name = EXCLUDED.display_name, updated_at = EXCLUDED.updated_at",
+                [(user_id, name, now) for user_id, name in names.items()]
+            )
+            conn.commit()
+        finally:
+            db_pool.putconn(conn)
+
+    def refresh(self):
+        """Reload every user from Slack, store them, and swap in the new map."""
+        if not self._refreshing.acquire(blocking=False):
+            return False
+        try:
+            names = self.fetch_from_slack()
+            self.save_to_db(names)
+            with self._lock:
+                self._names = names
+                self._loaded_at = time.time()
+            return True
+        except Exception as e:
+            self._failed_at = time.time()
+            print(f"Error refreshing user directory: {e}")
+            return False
+        finally:
+            self._refreshing.release()
+
+    def ensure_loaded(self):
+        """Fill the map from Postgres on first use and start a background refresh when it is stale."""
+        if not self._db_loaded:
+            self._db_loaded = True
+            try:
+                names, age = self.load_from_db()
+                with self._lock:
+                    self._names = names
+                    self._loaded_at = time.time() - (age if age is not None else self.ttl_seconds)
+            except Exception as e:
+                print(f"Error loading user directory from database: {e}")
+        now = time.time()
+        if (now - self._loaded_at >= self.ttl_seconds and now - self._failed_at >= self.retry_seconds
+                and not self._refreshing.locked()):
+            threading.Thread(target=self.refresh, name="user-directory-refresh", daemon=True).start()
+
+    def name(self, user_id):
+        """Display name for a user ID, or the ID itself if unknown."""
+        return self._names.get(user_id, user_id)
+
+user_directory = UserDirectory(ttl_seconds=USER_DIRECTORY_TTL_SECONDS)
+
+def resolve_names():
+    """Return a user_id -> display name lookup, loading the directory if needed."""
+    user_directory.ensure_loaded()
+    return user_directory.name
@@ -1,10 +1,20 @@
 import csv
 import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pytz
-from database import db_pool
+from psycopg2.extras import execute_values
+from database import db_pool, db_read_pool
+from event_log import record_ticket_event
+from auto_assign import track_transition
+from user_directory import resolve_names
+from profiling import stage
 from slack_client import client
-from config import TIMEZONE, SYSTEM_ISSUES_CHANNEL
+from config import (TIMEZONE, SYSTEM_ISSUES_CHANNEL, SLACK_UPDATE_CONCURRENCY,
+                    COMMENT_PREVIEW_COUNT, COMMENTS_PAGE_SIZE, COMMENT_MAX_CHARS,
+                    COMMENTS_SECTION_MAX_CHARS)
 
 def send_dm(user_id, text, blocks=None):
     try:
@@ -30,6 +40,129 @@ def find_ticket_by_id(ticket_id):
     finally:
         db_pool.putconn(conn)
 
+def list_active_tickets(limit=100):
+    """Return (ticket_id, issue_type, priority, status) for the most recent Open/In Progress tickets."""
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT ticket_id, issue_type, priority, status FROM tickets "
+            "WHERE status IN ('Open', 'In Progress') ORDER BY created_at DESC LIMIT %s",
+            (limit,)
+        )
+        return cur.fetchall()
+    finally:
+        db_pool.putconn(conn)
+
+def format_comment(comment):
+    """Render a (user_id, comment_text, created_at) row as one mrkdwn line."""
+    text = comment[1] if len(comment[1]) <= COMMENT_MAX_CHARS else comment[1][:COMMENT_MAX_CHARS] + "…"
+    return f"<@{comment[0]}>: {text} ({comment[2].strftime('%m/%d/%Y %H:%M:%S')})"
+
+def fetch_comment_previews(cur, ticket_ids, limit=COMMENT_PREVIEW_COUNT):
+    """Return {ticket_id: (total_count, latest comments oldest-first)} for the given tickets."""
+    previews = {tid: (0, []) for tid in ticket_ids}
+    if not ticket_ids:
+        return previews
+    cur.execute(
+        "SELECT ticket_id, user_id, comment_text, created_at, total FROM ("
+        "  SELECT ticket_id, user_id, comment_text, created_at,"
+        "         row_number() OVER (PARTITION BY ticket_id ORDER BY created_at DESC) AS rn,"
+        "         count(*) OVER (PARTITION BY ticket_id) AS total"
+        "  FROM comments WHERE ticket_id = ANY(%s)"
+        ") c WHERE rn <= %s ORDER BY ticket_id, created_at",
+        (list(ticket_ids), limit)
+    )
+    for ticket_id, user_id, comment_text, created_at, total in cur.fetchall():
+        previews[ticket_id] = (total, previews[ticket_id][1] + [(user_id, comment_text, created_at)])
+    return previews
+
+def get_comments_page(ticket_id, page=0, per_page=COMMENTS_PAGE_SIZE):
+    """Return (total_count, comments) for one page of a ticket's history, oldest first."""
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT count(*) FROM comments WHERE ticket_id = %s", (ticket_id,))
+        total = cur.fetchone()[0]
+        cur.execute(
+            "SELECT user_id, comment_text, created_at FROM comments WHERE ticket_id = %s "
+            "ORDER BY created_at LIMIT %s OFFSET %s",
+            (ticket_id, per_page, page * per_page)
+        )
+        return total, cur.fetchall()
+    finally:
+        db_pool.putconn(conn)
+
+def add_ticket_comment(ticket_id, user_id, comment, message_ts=None):
+    """Store a comment and append it to the ticket's thread without rewriting the parent message."""
+    conn = db_pool.getconn()
+    try:
+        cur = conn.cursor()
+        now = datetime.now(pytz.timezone(TIMEZONE))
+        cur.execute(
+            "INSERT INTO comments (ticket_id, user_id, comment_text, created_at) VALUES (%s, %s, %s, %s)",
+            (ticket_id, user_id, comment, now)
+        )
+        conn.commit()
+    finally:
+        db_pool.putconn(conn)
+    if message_ts:
+        post_comment_reply(message_ts, (user_id, comment, now))
+    return True
+
+def post_comment_reply(message_ts, comment):
+    """Post a single comment as a thread reply under the ticket message."""
+    try:
+        client.chat_postMessage(channel=SYSTEM_ISSUES_CHANNEL, thread_ts=message_ts,
+                                text=f"💬 {format_comment(comment)}")
+    except Exception as e:
+        print(f"Error posting comment reply: {e}")
+
+def build_ticket_blocks(ticket, comments, comment_count=None):
+    """Build the channel message blocks for a ticket row and a preview of its latest comments."""
+    ticket_id = ticket[0]
+    comment_count = len(comments) if comment_count is None else comment_count
+    lines = [format_comment(c) for c in comments]
+    # Drop the oldest preview lines until the whole section fits Slack's limit
+    while True:
+        comments_str = "\n".join(lines) or "N/A"
+        if comment_count > len(lines):
+            comments_str = f"_Showing latest {len(lines)} of {comment_count} comments_\n" + comments_str
+        if len(f"*Comments:* {comments_str}") <= COMMENTS_SECTION_MAX_CHARS or len(lines) <= 1:
+            break
+        lines = lines[1:]
+    blocks = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*Details:* {ticket[7]}"}},
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*Salesforce Link:* {ticket[8] or 'N/A'}"}},
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*Screenshot/Image:* {f'<{ticket[9]}|View Image>' if ticket[9] != 'No file uploaded' else 'No image uploaded'}"}},
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*Comments:* {comments_str}"}},
+        {"type": "divider"}
+    ]
+    action_elements = []
+    if ticket[5] == "Open" and ticket[6] == "Unassigned":
+        action_elements.append({"type": "button", "text": {"type": "plain_text", "text": "🖐 Assign to Me", "emoji": True},
+                                "action_id": f"assign_to_me_{ticket_id}", "value": str(ticket_id), "style": "primary"})
+    elif ticket[5] in ["Open", "In Progress"] and ticket[6] != "Unassigned":
+        action_elements.extend([
+            {"type": "button", "text": {"type": "plain_text", "text": "🔁 Reassign", "emoji": True},
+             "action_id": f"reassign_{ticket_id}", "value": str(ticket_id)},
+            {"type": "button", "text": {"type": "plain_text", "text": "❌ Close", "emoji": True},
+             "action_id": f"close_{ticket_id}", "value": str(ticket_id), "style": "danger"},
+            {"type": "button", "text": {"type": "plain_text", "text": "🟢 Resolve", "emoji": True},
+             "action_id": f"resolve_{ticket_id}", "value": str(ticket_id), "style": "primary"}
+        ])
+    elif ticket[5] in ["Closed", "Resolved"]:
+        action_elements.append({"type": "button", "text": {"type": "plain_text", "text": "🔄 Reopen", "emoji": True},
+                                "action_id": f"reopen_{ticket_id}", "value": str(ticket_id)})
+    action_elements.append({"type": "button", "text": {"type": "plain_text", "text": "✏️ Add Comment", "emoji": True},
+                            "action_id": f"add_comment_{ticket_id}", "value": str(ticket_id)})
+    if comment_count > len(lines):
+        action_elements.append({"type": "button", "text": {"type": "plain_text", "text": f"💬 All Comments ({comment_count})", "emoji": True},
+                                "action_id": f"view_comments_{ticket_id}", "value": str(ticket_id)})
+    if action_elements:
+        blocks.append({"type": "actions", "elements": action_elements})
+    return blocks
+
 def update_ticket_status(ticket_id, status, assigned_to=None, message_ts=None, comment=None, action_user_id=None):
     conn = db_pool.getconn()
     try:
@@ -49,48 +182,102 @@ def update_ticket_status(ticket_id, status, assigned_to=None, message_ts=None, c
                 (ticket_id, action_user_id, comment, now)
             )
         conn.commit()
+        record_ticket_event(ticket_id, "assigned" if new_assigned_to != ticket[6] else "status_changed",
+                            to_status=status, from_status=ticket[5], actor=action_user_id, assigned_to=new_assigned_to)
+        track_transition(ticket[6], ticket[5], new_assigned_to, status)
 
         if message_ts:
             cur.execute("SELECT * FROM tickets WHERE ticket_id = %s", (ticket_id,))
             updated_ticket = cur.fetchone()
-            cur.execute("SELECT user_id, comment_text, created_at FROM comments WHERE ticket_id = %s ORDER BY created_at", (ticket_id,))
-            comments = cur.fetchall()
-            comments_str = "\n".join([f"<@{c[0]}>: {c[1]} ({c[2].strftime('%m/%d/%Y %H:%M:%S')})" for c in comments]) or "N/A"
-            blocks = [
-                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Details:* {updated_ticket[7]}"}},
-                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Salesforce Link:* {updated_ticket[8] or 'N/A'}"}},
-                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Screenshot/Image:* {f'<{updated_ticket[9]}|View Image>' if updated_ticket[9] != 'No file uploaded' else 'No image uploaded'}"}},
-                {"type": "section", "text": {"type": "mrkdwn", "text": f"*Comments:* {comments_str}"}},
-                {"type": "divider"}
-            ]
-            action_elements = []
-            if updated_ticket[5] == "Open" and updated_ticket[6] == "Unassigned":
-                action_elements.append({"type": "button", "text": {"type": "plain_text", "text": "🖐 Assign to Me", "emoji": True},
-                                        "action_id": f"assign_to_me_{ticket_id}", "value": str(ticket_id), "style": "primary"})
-            elif updated_ticket[5] in ["Open", "In Progress"] and updated_ticket[6] != "Unassigned":
-                action_elements.extend([
-                    {"type": "button", "text": {"type": "plain_text", "text": "🔁 Reassign", "emoji": True},
-                     "action_id": f"reassign_{ticket_id}", "value": str(ticket_id)},
-                    {"type": "button", "text": {"type": "plain_text", "text": "❌ Close", "emoji": True},
-                     "action_id": f"close_{ticket_id}", "value": str(ticket_id), "style": "danger"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "🟢 Resolve", "emoji": True},
-                     "action_id": f"resolve_{ticket_id}", "value": str(ticket_id), "style": "primary"}
-                ])
-            elif updated_ticket[5] in ["Closed", "Resolved"]:
-                action_elements.append({"type": "button", "text": {"type": "plain_text", "text": "🔄 Reopen", "emoji": True},
-                                        "action_id": f"reopen_{ticket_id}", "value": str(ticket_id)})
-            if action_elements:
-                blocks.append({"type": "actions", "elements": action_elements})
+            comment_count, comments = fetch_comment_previews(cur, [ticket_id])[ticket_id]
+            with stage("render"):
+                blocks = build_ticket_blocks(updated_ticket, comments, comment_count)
             client.chat_update(channel=SYSTEM_ISSUES_CHANNEL, ts=message_ts, blocks=blocks)
+            if comment:
+                post_comment_reply(message_ts, (action_user_id, comment, now))
         return True
     finally:
         db_pool.putconn(conn)
 
-def export_tickets(status_filter, priority_filter, start_date, end_date, user_id):
+def bulk_update_tickets(ticket_ids, status, from_statuses, assigned_to=None, comment=None, action_user_id=None):
+    """Apply one status change to many tickets with a single UPDATE and refresh their messages.
+
+    Only tickets currently in one of from_statuses are changed. Returns the list
+    of ticket IDs that were actually updated.
+    """
+    ticket_ids = sorted({int(t) for t in ticket_ids})
+    if not ticket_ids:
+        return []
     conn = db_pool.getconn()
     try:
         cur = conn.cursor()
-        query = "SELECT ticket_id, created_by, campaign, issue_type, priority, status, assigned_to, details, salesforce_link, file_url, created_at, updated_at FROM tickets"
+        now = datetime.now(pytz.timezone(TIMEZONE))
+        cur.execute(
+            "UPDATE tickets t SET status = %s, assigned_to = COALESCE(%s, t.assigned_to), updated_at = %s "
+            "FROM (SELECT ticket_id, status, assigned_to FROM tickets "
+            "      WHERE ticket_id = ANY(%s) AND status = ANY(%s) FOR UPDATE) old "
+            "WHERE t.ticket_id = old.ticket_id RETURNING t.*, old.status, old.assigned_to",
+            (status, assigned_to, now, ticket_ids, list(from_statuses))
+        )
+        rows = cur.fetchall()
+        updated = [row[:13] for row in rows]
+        updated_ids = [t[0] for t in updated]
+        if comment and updated_ids:
+            execute_values(
+                cur,
+                "INSERT INTO comments (ticket_id, user_id, comment_text, created_at) VALUES %s",
+                [(tid, action_user_id, comment, now) for tid in updated_ids]
+            )
+        conn.commit()
+
+        for row in rows:
+            record_ticket_event(row[0], "assigned" if row[6] != row[14] else "status_changed",
+                                to_status=status, from_status=row[13], actor=action_user_id, assigned_to=row[6])
+            track_transition(row[14], row[13], row[6], status)
+        previews = fetch_comment_previews(cur, updated_ids)
+    finally:
+        db_pool.putconn(conn)
+
+    with stage("render"):
+        refreshes = [(t[12], build_ticket_blocks(t, previews[t[0]][1], previews[t[0]][0])) for t in updated if t[12]]
+    refresh_ticket_messages(refreshes)
+    if comment:
+        executor = _get_refresh_executor()
+        for t in updated:
+            if t[12]:
+                executor.submit(post_comment_reply, t[12], (action_user_id, comment, now))
+    return updated_ids
+
+_refresh_executor = None
+_refresh_executor_pid = None
+_refresh_executor_lock = threading.Lock()
+
+def _get_refresh_executor():
+    """Long-lived pool of SLACK_UPDATE_CONCURRENCY workers, rebuilt after a fork."""
+    global _refresh_executor, _refresh_executor_pid
+    with _refresh_executor_lock:
+        if _refresh_executor is None or _refresh_executor_pid != os.getpid():
+            _refresh_executor = ThreadPoolExecutor(max_workers=SLACK_UPDATE_CONCURRENCY, thread_name_prefix="slack-refresh")
+            _refresh_executor_pid = os.getpid()
+        return _refresh_executor
+
+def _update_ticket_message(message_ts, blocks):
+    try:
+        client.chat_update(channel=SYSTEM_ISSUES_CHANNEL, ts=message_ts, blocks=blocks)
+    except Exception as e:
+        print(f"Error updating ticket message {message_ts}: {e}")
+
+def refresh_ticket_messages(refreshes):
+    """Queue (message_ts, blocks) updates on the bounded worker pool and return immediately."""
+    executor = _get_refresh_executor()
+    for message_ts, blocks in refreshes:
+        executor.submit(_update_ticket_message, message_ts, blocks)
+
+def export_tickets(status_filter, priority_filter, start_date, end_date, user_id, include_archived=True):
+    conn = db_read_pool.getconn()
+    try:
+        cur = conn.cursor()
+        columns = "ticket_id, created_by, campaign, issue_type, priority, status, assigned_to, details, salesforce_link, file_url, created_at, updated_at"
         params = []
         where_clauses = []
         if status_filter and status_filter.lower() != "all":
@@ -99,31 +286,37 @@ def export_tickets(status_filter, priority_filter, start_date, end_date, user_id
         if priority_filter and priority_filter.lower() != "all":
             where_clauses.append("priority = %s")
             params.append(priority_filter)
+        # Bounds on created_at let Postgres prune monthly partitions
         if start_date:
             where_clauses.append("created_at >= %s")
             params.append(start_date)
         if end_date:
             where_clauses.append("created_at <= %s")
             params.append(end_date)
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+        where = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        query = f"SELECT {columns} FROM tickets{where}"
+        if include_archived:
+            query += f" UNION ALL SELECT {columns} FROM tickets_archive{where}"
+            params = params * 2
         query += " ORDER BY created_at DESC"
         cur.execute(query, params)
         tickets = cur.fetchall()
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["Ticket ID", "Created By", "Campaign", "Issue Type", "Priority", "Status", "Assigned To", "Details", "Salesforce Link", "File URL", "Created At", "Updated At"])
-        for ticket in tickets:
-            writer.writerow(ticket)
-        csv_content = output.getvalue()
-        output.close()
-
-        client.files_upload(
-            channels=user_id,
-            content=csv_content,
-            filename=f"tickets_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            title="Tickets Export"
-        )
     finally:
-        db_pool.putconn(conn)
\ No newline at end of file
+        db_read_pool.putconn(conn)
+
+    # Name lookup and the upload happen after the connection is back in the pool
+    name = resolve_names()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Ticket ID", "Created By", "Campaign", "Issue Type", "Priority", "Status", "Assigned To", "Details", "Salesforce Link", "File URL", "Created At", "Updated At"])
+    for ticket in tickets:
+        writer.writerow((ticket[0], name(ticket[1])) + ticket[2:6] + (name(ticket[6]),) + ticket[7:])
+    csv_content = output.getvalue()
+    output.close()
+
+    client.files_upload(
+        channels=user_id,
+        content=csv_content,
+        filename=f"tickets_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        title="Tickets Export"
+    )
\ No newline at end of file